@@ -0,0 +1,190 @@
+"""알레르기 성분 역색인 (카테고리 → 제품 비트셋) 과 주기적 재생성"""
+import array
+import logging
+import re
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+
+class AllergenIndex:
+    """
+    ★ 카테고리별 제품 비트셋 ★
+
+    제품마다 번호(0..n-1)를 붙이고, 카테고리마다 해당 제품 번호의 비트를 켠 정수를 만듭니다.
+    포함/제외 조건은 정수 AND / AND NOT 몇 번으로 끝나므로 제품이 수십만 개여도 빠르고,
+    제품별 정보는 리스트와 array로만 보관하여 dict보다 메모리를 적게 씁니다.
+    """
+    def __init__(self, categories, products):
+        """products: (출처, 제품명, 바코드, 품목보고번호, 검출된 카테고리 목록) 반복자"""
+        self.categories = list(categories)
+        if len(self.categories) > 64:
+            raise ValueError('AllergenIndex supports up to 64 categories')
+
+        bit_of = {category: bit for bit, category in enumerate(self.categories)}
+
+        self.sources = []
+        self.names = []
+        self.barcodes = []
+        self.report_nos = []
+        # 제품별 검출 카테고리 비트 (응답에 allergens 목록을 만들 때 사용)
+        self.product_masks = array.array('Q')
+
+        category_bits = [bytearray() for _ in self.categories]
+
+        for i, (source, name, barcode, report_no, found) in enumerate(products):
+            self.sources.append(source)
+            self.names.append(name)
+            self.barcodes.append(barcode)
+            self.report_nos.append(report_no)
+
+            product_mask = 0
+            byte_index, bit = divmod(i, 8)
+
+            for category in found:
+                category_bit = bit_of.get(category)
+                if category_bit is None:
+                    continue
+
+                product_mask |= 1 << category_bit
+                bits = category_bits[category_bit]
+                if len(bits) <= byte_index:
+                    bits.extend(bytes(byte_index + 1 - len(bits)))
+                bits[byte_index] |= 1 << bit
+
+            self.product_masks.append(product_mask)
+
+        self.size = len(self.names)
+        self.all_mask = (1 << self.size) - 1
+        # 한 비트씩 OR하면 O(n²)이므로 bytearray로 모은 뒤 한 번에 정수로 변환
+        self.bitsets = {
+            category: int.from_bytes(bits, 'little')
+            for category, bits in zip(self.categories, category_bits)
+        }
+        self.built_at = time.time()
+
+
+    def match(self, include=(), exclude=()):
+        """include 카테고리를 모두 포함하고 exclude 카테고리는 하나도 없는 제품 비트셋"""
+        mask = self.all_mask
+
+        for category in include:
+            mask &= self.bitsets[category]
+
+        for category in exclude:
+            mask &= ~self.bitsets[category]
+
+        return mask
+
+
+    def _iter_bits(self, mask, skip=0):
+        """켜진 비트 번호를 오름차순으로 반환 (앞의 skip개는 건너뜀)"""
+        data = mask.to_bytes((self.size + 7) // 8, 'little')
+
+        # 0 바이트 구간은 정규식(C 구현)으로 건너뜀
+        for match in _NONZERO_BYTE.finditer(data):
+            byte_index = match.start()
+            byte = data[byte_index]
+
+            if skip:
+                count = byte.bit_count()
+                if count <= skip:
+                    skip -= count
+                    continue
+
+            for bit in range(8):
+                if byte >> bit & 1:
+                    if skip:
+                        skip -= 1
+                        continue
+                    yield byte_index * 8 + bit
+
+
+    def item(self, i):
+        product_mask = self.product_masks[i]
+        return {
+            'source': self.sources[i],
+            'productName': self.names[i],
+            'barcode': self.barcodes[i],
+            'reportNo': self.report_nos[i],
+            'allergens': [category for bit, category in enumerate(self.categories) if product_mask >> bit & 1]
+        }
+
+
+    def query(self, include=(), exclude=(), offset=0, limit=50):
+        """(조건에 맞는 전체 제품 수, offset부터 limit개의 제품 목록) 반환"""
+        mask = self.match(include, exclude)
+        total = mask.bit_count()
+        items = []
+
+        if offset < total:
+            for i in self._iter_bits(mask, skip=offset):
+                if len(items) >= limit:
+                    break
+                items.append(self.item(i))
+
+        return total, items
+
+
+class RefreshingIndex:
+    """
+    ★ 주기적으로 다시 만드는 색인 ★
+
+    처음 사용할 때는 만들어질 때까지 기다리고, 이후에는 ttl이 지나면 기존 색인으로 응답하면서
+    executor에서 새 색인을 만들어 교체합니다. 다시 만들기에 실패하면 retry_after 뒤에 재시도합니다.
+    """
+    def __init__(self, builder, ttl, executor, retry_after=60):
+        self.builder = builder
+        self.ttl = ttl
+        self.executor = executor
+        self.retry_after = retry_after
+        self._index = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+
+    def _build(self):
+        started = time.monotonic()
+        index = self.builder()
+        logger.info("[Index] Built allergen index: %d products in %.1fs", index.size, time.monotonic() - started)
+
+        self._index = index
+        self._refresh_at = time.time() + self.ttl
+        return index
+
+
+    def _rebuild(self):
+        try:
+            self._build()
+        except Exception as e:
+            logger.warning("[Index] Rebuild failed, keeping previous index: %s", e)
+            self._refresh_at = time.time() + min(self.ttl, self.retry_after)
+        finally:
+            self._rebuilding = False
+
+
+    def get(self):
+        index = self._index
+
+        if index is None:
+            with self._lock:
+                return self._index or self._build()
+
+        if time.time() >= self._refresh_at:
+            with self._lock:
+                if not self._rebuilding:
+                    self._rebuilding = True
+                    self.executor.submit(self._rebuild)
+
+        return index
+
+
+    def invalidate(self):
+        """다음 조회 때 백그라운드에서 다시 만들도록 표시 (제품 추가 후)"""
+        self._refresh_at = 0.0
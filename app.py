@@ -1,24 +1,83 @@
-from flask import Flask, render_template, request, jsonify
-from supabase import create_client, Client
+from flask import Flask, render_template, request, jsonify, g, Response
 from dotenv import load_dotenv
 import os
+import logging
+import uuid
+import contextvars
+import time
 import requests
 import urllib.parse
 import re
-from html.parser import HTMLParser
+import sqlite3
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from product_cache import LRUCache, ProductCache, SQLiteCacheBackend, MISSING
+from local_store import BarcodeMappingStore, HACCPMirrorStore
+from food_apis import (
+    haccp_items, foodqr_item, c005_result, c005_mapping,
+    iter_haccp_stream, iter_foodqr_stream, iter_c005_stream, iter_pages
+)
+from json_stream import CHUNK_SIZE
+from ingredient_matcher import IngredientMatcher
+from http_clients import HTTPClientPool, LazyClient, parse_host_pool_sizes
+import product_record
+from product_record import from_custom_product, from_foodqr, from_haccp
+from circuit_breaker import CircuitBreaker, CircuitOpenError, count_thread_error, thread_error_count
+from single_flight import SingleFlight
+from allergen_index import AllergenIndex, RefreshingIndex
+from log_config import configure_logging, restart_after_fork, request_id_var
+import metrics
+import search_input
+import tracing
 
 
 load_dotenv()
 
 
+# ★ 로깅 설정 ★
+# LOG_LEVEL=DEBUG로 설정하면 API 응답 전체 등 디버그 로그 출력 (기본값에서는 포맷팅 비용도 없음)
+# LOG_SAMPLE_RATE: INFO 이하 로그를 남길 요청 비율 (0~1), WARNING 이상은 항상 기록
+configure_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    log_format=os.getenv('LOG_FORMAT', 'text'),
+    sample_rate=float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+)
+logger = logging.getLogger(__name__)
+
+
 app = Flask(__name__)
 
 
 # ★ Supabase 설정 ★
+# 클라이언트는 처음 사용할 때 만듦 (설정이 없거나 잘못되어도 워커 시작은 실패하지 않고 /readyz에서 확인)
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+class SupabaseUnavailable(Exception):
+    """Supabase 설정이 없거나 클라이언트를 만들 수 없음"""
+
+
+def _create_supabase_client():
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise SupabaseUnavailable('SUPABASE_URL / SUPABASE_KEY not set')
+    
+    # supabase 패키지는 불러오는 데만 수백 ms가 걸리므로 필요할 때 불러옴
+    from supabase import create_client
+    
+    try:
+        return create_client(SUPABASE_URL, SUPABASE_KEY)
+    except Exception as e:
+        raise SupabaseUnavailable(f'Supabase client init failed: {e}') from e
+
+
+supabase_client = LazyClient(_create_supabase_client)
+
+
+def get_supabase():
+    """Supabase 클라이언트 (없으면 만들고, 만들 수 없으면 SupabaseUnavailable)"""
+    return supabase_client.get()
 
 
 # API 키
@@ -27,10 +86,145 @@ FOODQR_ACCESS_KEY = os.getenv('FOODQR_ACCESS_KEY')
 FOOD_SAFETY_API_KEY = os.getenv('FOOD_SAFETY_API_KEY')  # C005 API용 키
 
 
-# API URL
-HACCP_API_URL = 'https://apis.data.go.kr/B553748/CertImgListServiceV3/getCertImgListServiceV3'
-FOOD_QR_API_URL = 'https://foodqr.kr/openapi/service/qr1007/F007'
-BARCODE_LINK_API_URL = 'http://openapi.foodsafetykorea.go.kr/api'  # C005 바코드연계제품정보
+# API URL (벤치마크 등에서 로컬 스텁 서버로 바꿀 수 있도록 환경 변수로 재정의 가능)
+HACCP_API_URL = os.getenv('HACCP_API_URL', 'https://apis.data.go.kr/B553748/CertImgListServiceV3/getCertImgListServiceV3')
+FOOD_QR_API_URL = os.getenv('FOOD_QR_API_URL', 'https://foodqr.kr/openapi/service/qr1007/F007')
+BARCODE_LINK_API_URL = os.getenv('BARCODE_LINK_API_URL', 'http://openapi.foodsafetykorea.go.kr/api')  # C005 바코드연계제품정보
+
+
+# ★ 공공 API HTTP 연결 풀 (워커 프로세스당) ★
+# 연결 타임아웃과 읽기 타임아웃을 분리하여, 응답 없는 서버에 연결하느라 오래 기다리지 않도록 함
+http_pool = HTTPClientPool(
+    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 32)),
+    connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05)),
+    read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', 15)),
+    host_pool_sizes=parse_host_pool_sizes(os.getenv('HTTP_HOST_POOL_SIZES'))
+)
+
+
+# ★ 업스트림별 서킷 브레이커 ★
+# 느리거나 장애가 난 공공 API 하나 때문에 워커가 모두 묶이지 않도록,
+# 실패율이 높은 출처는 잠시 건너뛰고 읽기 타임아웃은 최근 지연 시간으로 조정
+def _circuit_breaker(name):
+    return CircuitBreaker(
+        name,
+        min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', 10)),
+        failure_rate=float(os.getenv('CIRCUIT_FAILURE_RATE', 0.5)),
+        open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', 30)),
+        min_timeout=float(os.getenv('UPSTREAM_MIN_TIMEOUT', 2)),
+        max_timeout=http_pool.read_timeout
+    )
+
+
+circuit_breakers = {
+    'supabase': _circuit_breaker('supabase'),
+    'haccp': _circuit_breaker('haccp'),
+    'foodqr': _circuit_breaker('foodqr'),
+    'c005': _circuit_breaker('c005')
+}
+
+
+def call_upstream(source, func, *args, **kwargs):
+    """서킷 브레이커를 거쳐 업스트림 호출 (지연 시간/오류 메트릭 기록)"""
+    started = time.monotonic()
+    
+    try:
+        result = circuit_breakers[source].call(func, *args, **kwargs)
+    except CircuitOpenError:
+        metrics.UPSTREAM_ERRORS.labels(source, 'circuit_open').inc()
+        raise
+    except requests.exceptions.Timeout:
+        metrics.UPSTREAM_LATENCY.labels(source).observe(time.monotonic() - started)
+        metrics.UPSTREAM_ERRORS.labels(source, 'timeout').inc()
+        raise
+    except Exception:
+        metrics.UPSTREAM_LATENCY.labels(source).observe(time.monotonic() - started)
+        metrics.UPSTREAM_ERRORS.labels(source, 'error').inc()
+        raise
+    
+    metrics.UPSTREAM_LATENCY.labels(source).observe(time.monotonic() - started)
+    
+    if getattr(result, 'status_code', 200) >= 500:
+        metrics.UPSTREAM_ERRORS.labels(source, 'http_5xx').inc()
+    
+    return result
+
+
+def upstream_get(source, url, deadline=None, **kwargs):
+    """
+    서킷 브레이커를 거쳐 공공 API GET 요청 (읽기 타임아웃은 최근 지연 시간 기준)
+    
+    deadline(time.monotonic 기준)을 주면 읽기 타임아웃을 남은 시간 이내로 줄입니다.
+    """
+    read_timeout = circuit_breakers[source].read_timeout()
+    if deadline is not None:
+        read_timeout = max(0.1, min(read_timeout, deadline - time.monotonic()))
+    
+    timeout = (http_pool.connect_timeout, read_timeout)
+    return call_upstream(source, http_pool.get, url, timeout=timeout, **kwargs)
+
+
+def upstream_deadline(source):
+    """업스트림 호출 여러 번을 묶어 제한할 마감 시각 (연결 + 읽기 타임아웃 한 번 분량)"""
+    return time.monotonic() + http_pool.connect_timeout + circuit_breakers[source].read_timeout()
+
+
+# ★ 검색 단계 병렬 실행용 스레드 풀 ★
+# 요청 하나당 최대 4개 단계가 동시에 실행되므로 워커당 동시 요청 수 × 4 정도로 설정
+SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', 32))
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix='search')
+
+def submit_with_context(executor, fn, *args):
+    """현재 요청의 contextvars(요청 ID 등)를 유지한 채 스레드 풀에 작업 제출"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+# ★ /search/batch 설정 ★
+# 배치 항목은 별도 풀에서 처리 (항목마다 search_executor에 단계를 제출하므로 같은 풀을 쓰면 교착 가능)
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 200))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 8))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_CONCURRENCY, thread_name_prefix='batch')
+
+
+# ★ 동일 검색값 동시 요청 병합 ★
+# 같은 바코드가 동시에 여러 번 스캔되면 한 번만 검색하고 결과를 함께 사용 (API 호출 수/할당량 절약)
+search_flight = SingleFlight()
+
+
+# ★ 검색 결과 캐시 설정 ★
+# 출처별 TTL (초). 공공 API 데이터는 자주 바뀌지 않으므로 길게, Supabase는 짧게 유지
+CACHE_TTLS = {
+    'supabase': int(os.getenv('CACHE_TTL_SUPABASE', 300)),
+    'haccp': int(os.getenv('CACHE_TTL_HACCP', 86400)),
+    'foodqr': int(os.getenv('CACHE_TTL_FOODQR', 86400)),
+    'c005': int(os.getenv('CACHE_TTL_C005', 7 * 86400))
+}
+# 검색 실패(None) 결과 캐시 시간
+CACHE_NEGATIVE_TTL = int(os.getenv('CACHE_NEGATIVE_TTL', 60))
+# 설정 시 같은 서버의 모든 gunicorn 워커가 공유하는 SQLite 캐시 파일 사용
+PRODUCT_CACHE_DB = os.getenv('PRODUCT_CACHE_DB')
+# 공유 캐시에 이 횟수만큼 쓸 때마다 만료된 항목 삭제 (0이면 삭제하지 않음)
+PRODUCT_CACHE_PURGE_EVERY = int(os.getenv('PRODUCT_CACHE_PURGE_EVERY', 1000))
+
+product_cache = ProductCache(
+    maxsize=int(os.getenv('PRODUCT_CACHE_SIZE', 10000)),
+    backend=SQLiteCacheBackend(
+        PRODUCT_CACHE_DB, product_record.dumps, product_record.loads, PRODUCT_CACHE_PURGE_EVERY
+    ) if PRODUCT_CACHE_DB else None,
+    on_lookup=lambda source, result: metrics.CACHE_LOOKUPS.labels(source, result).inc()
+)
+
+
+# ★ 바코드 → 품목보고번호 매핑 저장소 (C005 검색 결과 재사용) ★
+LOCAL_STORE_DB = os.getenv('LOCAL_STORE_DB', 'local_store.db')
+# import_c005.py로 C005 데이터셋 전체를 미리 가져와 두면 88 바코드는 대부분 로컬에서 처리됨
+# 매핑 갱신 주기 (일). 지난 매핑도 사용하되 백그라운드에서 C005로 다시 확인
+MAPPING_REFRESH_DAYS = int(os.getenv('MAPPING_REFRESH_DAYS', 30))
+
+barcode_mapping_store = BarcodeMappingStore(LOCAL_STORE_DB, refresh_after=MAPPING_REFRESH_DAYS * 86400)
+
+# HACCP 인증 제품 로컬 사본 (없는 제품은 실시간 API로 조회 후 저장)
+haccp_mirror = HACCPMirrorStore(LOCAL_STORE_DB)
 
 
 # 카테고리별 원재료 매핑
@@ -122,251 +316,479 @@ INGREDIENTS_TO_CHECK = {
 }
 
 
-print(f"\n{'='*60}")
-print("Environment Check:")
-print(f"SERVICE_KEY: {'✓ SET' if SERVICE_KEY else '✗ NOT SET'}")
-print(f"FOODQR_ACCESS_KEY: {'✓ SET' if FOODQR_ACCESS_KEY else '✗ NOT SET'}")
-print(f"FOOD_SAFETY_API_KEY: {'✓ SET' if FOOD_SAFETY_API_KEY else '✗ NOT SET'}")
-print(f"SUPABASE_URL: {'✓ SET' if SUPABASE_URL else '✗ NOT SET'}")
-print(f"SUPABASE_KEY: {'✓ SET' if SUPABASE_KEY else '✗ NOT SET'}")
-print(f"{'='*60}\n")
+# ★ 서버 시작 시 한 번만 컴파일하는 원재료 검출기 ★
+ingredient_matcher = IngredientMatcher(INGREDIENTS_TO_CHECK)
 
 
-class HTMLStripper(HTMLParser):
-    """HTML 태그 제거"""
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = []
+@tracing.traced('match', with_detail=False)
+def find_ingredients(raw_materials):
+    """원재료명에서 해당하는 모든 원재료 검출"""
+    return ingredient_matcher.find(raw_materials)
+
 
+# 검색에 필요한 컬럼만 조회 (barcode/imrpt_no는 어느 키로 찾았는지 구분용)
+# found_ingredients/matcher_version은 sql/002 마이그레이션으로 추가된 컬럼 (배포 전에 적용 필요)
+CUSTOM_PRODUCT_COLUMNS = 'id,barcode,imrpt_no,product_name,raw_materials,found_ingredients,matcher_version'
+# ★ sql/002 컬럼은 배포 전제 조건 ★ (검색, /add-product, 색인이 모두 사용)
+# 적용되지 않았으면 /readyz가 503을 반환하여, 스키마 오류가 '제품 없음'으로 처리되지 않도록 함
+CUSTOM_PRODUCT_ANALYSIS_COLUMNS = 'found_ingredients,allergens,matcher_version'
+# PostgreSQL undefined_column 오류 코드
+UNDEFINED_COLUMN = '42703'
+CUSTOM_PRODUCT_SCHEMA_ERROR = 'custom_products is missing sql/002 columns (apply sql/002_custom_products_allergen_analysis.sql)'
+# 배치 조회 시 한 번에 보낼 최대 키 수 (URL 길이 제한)
+CUSTOM_DATABASE_BATCH_SIZE = 100
 
-    def handle_data(self, d):
-        self.text.append(d)
 
+# sql/002 컬럼 확인 결과 (None: 아직 확인 안 함, 검색 중 스키마 오류가 나면 False)
+_custom_products_schema_ok = None
 
-    def get_data(self):
-        return ''.join(self.text)
 
+def is_schema_error(error):
+    """PostgREST 오류가 없는 컬럼 조회(sql/002 미적용)인지"""
+    return getattr(error, 'code', None) == UNDEFINED_COLUMN
 
-def strip_html(html_text):
-    """HTML 태그 제거 함수"""
-    if not html_text:
-        return ''
+
+def report_schema_error(error):
+    """스키마 오류 기록 (이후 /readyz가 준비 안 됨을 반환)"""
+    global _custom_products_schema_ok
+    _custom_products_schema_ok = False
+    logger.error("[Supabase] %s: %s", CUSTOM_PRODUCT_SCHEMA_ERROR, error)
+
+
+def custom_products_schema_check():
+    """
+    레디니스 항목: sql/002 컬럼 확인 (한 번 확인되면 다시 조회하지 않음)
+    
+    서킷 브레이커를 거치지 않으며, 네트워크 오류 등 스키마와 무관한 실패는 준비 안 됨으로 보지 않습니다.
+    """
+    global _custom_products_schema_ok
+    
+    if _custom_products_schema_ok:
+        return {'ok': True}
     
-    stripper = HTMLStripper()
     try:
-        stripper.feed(html_text)
-        return stripper.get_data().replace('\n', '').replace('  ', ' ').strip()
-    except:
-        text = re.sub(r'<[^>]+>', '', html_text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        get_supabase().table('custom_products').select(f'id,{CUSTOM_PRODUCT_ANALYSIS_COLUMNS}').limit(1).execute()
+    except Exception as e:
+        if is_schema_error(e):
+            _custom_products_schema_ok = False
+            return {'ok': False, 'error': CUSTOM_PRODUCT_SCHEMA_ERROR}
+        return {'ok': True, 'verified': False, 'error': str(e)}
+    
+    _custom_products_schema_ok = True
+    return {'ok': True}
 
 
-def find_ingredients(raw_materials):
-    """원재료명에서 해당하는 모든 원재료 검출"""
-    found_ingredients = {}
+def _postgrest_quote(value):
+    """PostgREST 필터 값 인용 (쉼표/괄호가 포함된 입력도 안전하게)"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _or_filter(query, conditions):
+    """PostgREST or 필터 추가 (supabase 1.0.3의 postgrest 클라이언트에는 or_가 없음)"""
+    query.params = query.params.add('or', f'({conditions})')
+    return query
+
+
+def allergen_analysis(raw_materials):
+    """
+    ★ custom_products에 함께 저장하는 원재료 분석 결과 ★
+    
+    allergens(카테고리 목록)는 DB에서 알레르기 성분으로 제품을 조회할 때 사용합니다.
+    matcher_version이 현재 검출기 버전과 다르면 검색 시 다시 분석하고 백그라운드에서 갱신합니다.
+    """
+    found_ingredients = ingredient_matcher.find(raw_materials)
+    return {
+        'found_ingredients': found_ingredients,
+        'allergens': sorted(found_ingredients),
+        'matcher_version': ingredient_matcher.version
+    }
+
+
+# 이 프로세스에서 분석 결과 갱신을 요청한 행 (같은 행을 반복해서 갱신하지 않도록)
+# 갱신 후에도 Supabase 캐시 TTL 동안은 이전 결과가 캐시에 남으므로 그동안만 기억하고, 실패하면 바로 지움
+_analysis_refresh_requested = LRUCache(maxsize=int(os.getenv('ANALYSIS_REFRESH_TRACKED', 10000)))
+
+
+def _update_stored_analysis(row_id, raw_materials):
+    try:
+        query = get_supabase().table('custom_products').update(allergen_analysis(raw_materials)).eq('id', row_id)
+        call_upstream('supabase', query.execute)
+        logger.info("[Supabase] Stored analysis refreshed for product %s", row_id)
+    except Exception as e:
+        # 다음 검색 때 다시 시도
+        _analysis_refresh_requested.delete(row_id)
+        logger.warning("[Supabase] Failed to refresh stored analysis for product %s: %s", row_id, e)
+
+
+def refresh_stored_analysis(product):
+    """저장된 분석 결과가 없거나 이전 버전인 행을 백그라운드에서 갱신"""
+    row_id = product.row_id
+    
+    if row_id is None or _analysis_refresh_requested.get(row_id) is not MISSING:
+        return
     
-    for category, data in INGREDIENTS_TO_CHECK.items():
-        detected_keywords = []
+    _analysis_refresh_requested.set(row_id, True, time.time() + CACHE_TTLS['supabase'])
+    submit_with_context(search_executor, _update_stored_analysis, row_id, product.raw_materials)
+
+
+# ★ 알레르기 성분 역색인 (/api/allergen-filter) ★
+# custom_products와 HACCP 로컬 사본 전체를 대상으로, ALLERGEN_INDEX_TTL(초)마다 백그라운드에서 다시 만듦
+ALLERGEN_INDEX_TTL = int(os.getenv('ALLERGEN_INDEX_TTL', 3600))
+ALLERGEN_FILTER_MAX_LIMIT = 200
+
+# 카테고리 이름(한글) 또는 영문 이름(대소문자 무시, 'Milk & Dairy'는 milk/dairy로도)으로 지정 가능
+ALLERGEN_CATEGORY_NAMES = {
+    **{
+        name: category
+        for category, data in INGREDIENTS_TO_CHECK.items()
+        for name in [data['english'].lower(), *re.split(r'\s*&\s*', data['english'].lower())]
+    },
+    **{category: category for category in INGREDIENTS_TO_CHECK}
+}
+
+
+def _custom_products_for_index(batch_size=1000):
+    """custom_products 전체를 id 순으로 나누어 조회"""
+    try:
+        client = get_supabase()
+    except SupabaseUnavailable as e:
+        logger.warning("[Index] Custom products skipped: %s", e)
+        return
+    
+    after_id = 0
+    
+    while True:
+        query = client.table('custom_products')\
+            .select('id,barcode,imrpt_no,product_name,raw_materials,allergens,matcher_version')\
+            .gt('id', after_id)\
+            .order('id')\
+            .limit(batch_size)
+        rows = call_upstream('supabase', query.execute).data or []
         
-        for keyword in data['keywords']:
-            if keyword in raw_materials:
-                detected_keywords.append(keyword)
+        if not rows:
+            return
         
-        if detected_keywords:
-            found_ingredients[category] = {
-                'english': data['english'],
-                'detected': detected_keywords
-            }
+        yield from rows
+        after_id = rows[-1]['id']
+
+
+def _allergen_index_products():
+    """색인할 제품 (출처, 제품명, 바코드, 품목보고번호, 검출된 카테고리) 목록"""
+    indexed_report_nos = set()
+    
+    for row in _custom_products_for_index():
+        # 저장된 분석 결과가 최신이면 다시 분석하지 않음
+        if row.get('matcher_version') == ingredient_matcher.version and row.get('allergens') is not None:
+            allergens = row['allergens']
+        else:
+            allergens = ingredient_matcher.find(row.get('raw_materials') or '')
+        
+        if row.get('imrpt_no'):
+            indexed_report_nos.add(row['imrpt_no'])
+        
+        yield 'Custom Database', row['product_name'], row.get('barcode'), row.get('imrpt_no'), allergens
+    
+    # 검색과 같이 Supabase에 있는 제품이 HACCP보다 우선
+    try:
+        for product in haccp_mirror.iter_products():
+            if product.report_no in indexed_report_nos:
+                continue
+            
+            yield (
+                'HACCP',
+                product.name_or('Unknown Product'),
+                product.barcode,
+                product.report_no,
+                ingredient_matcher.find(product.raw_materials)
+            )
+    except sqlite3.Error as e:
+        logger.warning("[Index] HACCP mirror skipped: %s", e)
+
+
+def build_allergen_index():
+    return AllergenIndex(INGREDIENTS_TO_CHECK, _allergen_index_products())
+
+
+# 색인 생성은 오래 걸릴 수 있으므로 검색용 풀과 별도의 스레드에서 실행
+index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='index')
+allergen_index = RefreshingIndex(build_allergen_index, ALLERGEN_INDEX_TTL, index_executor)
+
+
+def _match_custom_products(rows, search_values):
+    """조회된 행을 검색값별로 매칭 (바코드 일치가 품목보고번호 일치보다 우선)"""
+    by_barcode = {}
+    by_imrpt_no = {}
+    
+    for row in rows:
+        by_barcode.setdefault(row.get('barcode'), row)
+        by_imrpt_no.setdefault(row.get('imrpt_no'), row)
     
-    return found_ingredients
+    return {
+        search_value: by_barcode.get(search_value) or by_imrpt_no.get(search_value)
+        for search_value in search_values
+    }
 
 
+@tracing.traced('supabase')
+@product_cache.cached('supabase', CACHE_TTLS['supabase'], CACHE_NEGATIVE_TTL, thread_error_count)
 def search_custom_database(search_value):
-    """Supabase에서 검색"""
+    """Supabase에서 검색 (barcode 또는 imrpt_no를 한 번의 쿼리로)"""
     try:
-        response = (
-            supabase.table('custom_products')
-            .select('*')
-            .eq('barcode', search_value)
-            .execute()
+        quoted = _postgrest_quote(search_value)
+        query = get_supabase().table('custom_products').select(CUSTOM_PRODUCT_COLUMNS)
+        response = call_upstream(
+            'supabase', _or_filter(query, f'barcode.eq.{quoted},imrpt_no.eq.{quoted}').execute
         )
         
-        if not response.data or len(response.data) == 0:
-            response = (
-                supabase.table('custom_products')
-                .select('*')
-                .eq('imrpt_no', search_value)
-                .execute()
-            )
+        product = _match_custom_products(response.data or [], [search_value])[search_value]
         
-        if response.data and len(response.data) > 0:
-            product = response.data[0]
-            print(f"[Supabase] ✓ Found: {product['product_name']}")
-            return {
-                'source': 'Custom Database',
-                'product': {
-                    'prdctNm': product['product_name'],
-                    'prvwCn': product['raw_materials']
-                }
-            }
+        if product:
+            logger.info("[Supabase] ✓ Found: %s", product['product_name'])
+            return from_custom_product(product)
         return None
         
+    except CircuitOpenError:
+        logger.warning("[Supabase] Circuit open, skipped")
+        return None
+    except SupabaseUnavailable as e:
+        logger.warning("[Supabase] Skipped: %s", e)
+        return None
     except Exception as e:
-        print(f"[Supabase Error] {str(e)}")
-        import traceback
-        traceback.print_exc()
+        if is_schema_error(e):
+            report_schema_error(e)
+        else:
+            logger.exception("[Supabase Error] %s", e)
         return None
 
 
+def search_custom_database_batch(search_values):
+    """
+    ★ 여러 검색값을 Supabase 쿼리 한 번(최대 CUSTOM_DATABASE_BATCH_SIZE개씩)으로 조회 ★
+    
+    결과는 search_custom_database 캐시에 채워 넣으므로, 이후 항목별 검색은 네트워크 요청 없이 처리됩니다.
+    조회에 실패한 경우 캐시를 채우지 않고 항목별 검색에 맡깁니다.
+    """
+    search_values = [
+        value for value in dict.fromkeys(search_values)
+        if product_cache.get('supabase', value, record=False) is MISSING
+    ]
+    
+    for i in range(0, len(search_values), CUSTOM_DATABASE_BATCH_SIZE):
+        chunk = search_values[i:i + CUSTOM_DATABASE_BATCH_SIZE]
+        quoted = ','.join(_postgrest_quote(value) for value in chunk)
+        
+        try:
+            query = get_supabase().table('custom_products').select(CUSTOM_PRODUCT_COLUMNS)
+            response = call_upstream(
+                'supabase', _or_filter(query, f'barcode.in.({quoted}),imrpt_no.in.({quoted})').execute
+            )
+        except Exception as e:
+            if is_schema_error(e):
+                report_schema_error(e)
+            else:
+                logger.warning("[Supabase Batch Error] %s", e)
+            continue
+        
+        matches = _match_custom_products(response.data or [], chunk)
+        logger.info("[Supabase] Batch lookup: %d/%d found", sum(1 for row in matches.values() if row), len(chunk))
+        
+        for search_value, product in matches.items():
+            if product:
+                product_cache.set('supabase', search_value, from_custom_product(product), CACHE_TTLS['supabase'])
+            else:
+                product_cache.set('supabase', search_value, None, CACHE_NEGATIVE_TTL)
+
+
+# ★ 업스트림 페이지 크기 ★
+# 단건 검색은 첫 번째 행만 사용하므로 1건만 요청 (응답 크기, 전송 시간, JSON 파싱 비용 절약)
+LOOKUP_ROWS = 1
+# 여러 행이 필요한 조회(iter_haccp_products 등)의 페이지 크기 (각 API의 최대 건수 이내)
+LIST_PAGE_SIZES = {
+    'haccp': int(os.getenv('HACCP_LIST_PAGE_SIZE', 100)),
+    'foodqr': int(os.getenv('FOODQR_LIST_PAGE_SIZE', 100)),
+    'c005': int(os.getenv('C005_LIST_PAGE_SIZE', 1000))
+}
+
+
+def c005_url(barcode, start=1, end=LOOKUP_ROWS):
+    """C005 바코드 검색 URL"""
+    # ✅ 올바른 URL 구성: 파라미터를 경로에 포함
+    # 형식: /api/{인증키}/C005/{dataType}/{startIdx}/{endIdx}/BAR_CD={바코드값}
+    return f"{BARCODE_LINK_API_URL}/{FOOD_SAFETY_API_KEY}/C005/json/{start}/{end}/BAR_CD={barcode}"
+
+
+@tracing.traced('c005')
+@product_cache.cached('c005', CACHE_TTLS['c005'], CACHE_NEGATIVE_TTL, thread_error_count)
 def search_barcode_link_api(barcode):
     """
     ★ C005 바코드연계제품정보 API로 바코드 → 품목보고번호 매핑 ★
     """
     try:
         if not FOOD_SAFETY_API_KEY:
-            print("[C005] API Key not set")
+            logger.warning("[C005] API Key not set")
             return None
         
-        # ✅ 올바른 URL 구성: 파라미터를 경로에 포함
-        # 형식: /api/{인증키}/C005/{dataType}/{startIdx}/{endIdx}/BAR_CD={바코드값}
-        url = f"{BARCODE_LINK_API_URL}/{FOOD_SAFETY_API_KEY}/C005/json/1/100/BAR_CD={barcode}"
+        url = c005_url(barcode)
         
-        print(f"[C005] Searching barcode: {barcode}")
-        print(f"[C005] Request URL: {url}")
+        logger.info("[C005] Searching barcode: %s", barcode)
+        logger.debug("[C005] Request URL: %s", url)
         
         # params 없이 직접 URL로 요청
-        response = requests.get(url, timeout=15)
+        response = upstream_get('c005', url)
         
-        print(f"[C005] Status Code: {response.status_code}")
+        logger.debug("[C005] Status Code: %s", response.status_code)
         
         if response.status_code != 200:
-            print(f"[C005] Failed with status {response.status_code}")
-            print(f"[C005] Response: {response.text[:500]}")
+            logger.warning("[C005] Failed with status %s", response.status_code)
+            logger.debug("[C005] Response: %.500s", response.text)
             return None
         
         result = response.json()
-        print(f"[C005] Response: {result}")
+        logger.debug("[C005] Response: %s", result)
         
         # 응답 구조: {"C005": {"total_count": "1", "row": [...], "RESULT": {...}}}
         if result.get('C005'):
-            c005_data = result['C005']
+            result_code, result_msg, total_count, rows = c005_result(result)
             
-            # 에러 코드 체크
-            result_info = c005_data.get('RESULT', {})
-            result_code = result_info.get('CODE')
-            result_msg = result_info.get('MSG')
-            
-            print(f"[C005] Result Code: {result_code}")
-            print(f"[C005] Result Message: {result_msg}")
+            logger.debug("[C005] Result: %s %s", result_code, result_msg)
             
             # INFO-000: 정상 처리
             # INFO-200: 해당하는 데이터가 없습니다
             if result_code == 'INFO-200':
-                print("[C005] No data found for this barcode")
+                logger.info("[C005] No data found for this barcode")
                 return None
             
             if result_code and result_code != 'INFO-000':
-                print(f"[C005] API Error: {result_code} - {result_msg}")
+                logger.warning("[C005] API Error: %s - %s", result_code, result_msg)
                 return None
             
-            rows = c005_data.get('row', [])
-            total_count = c005_data.get('total_count', '0')
-            
-            print(f"[C005] Total count: {total_count}")
+            logger.debug("[C005] Total count: %s", total_count)
             
-            if rows and len(rows) > 0:
+            if rows:
                 # 첫 번째 결과 사용
-                product = rows[0]
-                report_no = product.get('PRDLST_REPORT_NO')
-                product_name = product.get('PRDLST_NM', 'Unknown')
+                mapping = c005_mapping(rows[0], barcode)
                 
-                print(f"[C005] ✓ Found mapping: {barcode} → {report_no}")
-                print(f"[C005] Product: {product_name}")
+                logger.info("[C005] ✓ Found mapping: %s → %s (%s)", barcode, mapping['product_report_no'], mapping['product_name'])
                 
-                return {
-                    'product_report_no': report_no,
-                    'product_name': product_name,
-                    'barcode': barcode,
-                    'manufacturer': product.get('BSSH_NM', ''),
-                    'product_type': product.get('PRDLST_DCNM', ''),
-                    'report_date': product.get('PRMS_DT', ''),
-                    'address': product.get('SITE_ADDR', '')
-                }
-        
-        print("[C005] No data found in response")
+                barcode_mapping_store.put(mapping)
+                
+                return mapping
+        
+        logger.info("[C005] No data found in response")
         return None
         
     except requests.exceptions.Timeout:
-        print("[C005] Request timeout")
+        logger.warning("[C005] Request timeout")
+        return None
+    except CircuitOpenError:
+        logger.warning("[C005] Circuit open, skipped")
         return None
     except Exception as e:
-        print(f"[C005] Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[C005] Error: %s", e)
         return None
 
 
+def haccp_params(search_value, num_of_rows=LOOKUP_ROWS, page_no=1):
+    """HACCP 품목보고번호 검색 파라미터"""
+    return {
+        'serviceKey': urllib.parse.unquote(SERVICE_KEY),
+        'prdlstReportNo': search_value,
+        'returnType': 'json',
+        'numOfRows': num_of_rows,
+        'pageNo': page_no
+    }
+
+
+# 로컬 사본 항목을 그대로 사용할 기간 (일). 지나면 실시간 API로 다시 조회하고, 조회에 실패하면 로컬 사본 사용
+# sync_haccp.py의 전체 동기화 주기(HACCP_FULL_SYNC_DAYS)보다 길게 설정
+HACCP_MIRROR_MAX_AGE = float(os.getenv('HACCP_MIRROR_MAX_AGE_DAYS', 14)) * 86400
+
+
+def mirror_lookup(search_value):
+    """HACCP 로컬 사본 조회 → (사용할 제품, 오래된 제품) (없으면 둘 다 None)"""
+    entry = haccp_mirror.get_entry(search_value)
+    
+    if not entry:
+        return None, None
+    
+    product, updated_at = entry
+    
+    if time.time() - updated_at < HACCP_MIRROR_MAX_AGE:
+        logger.info("[HACCP] ✓ Found in local mirror: %s", product.name_or('Unknown'))
+        return product, None
+    
+    logger.info("[HACCP] Local mirror entry is stale, checking live API: %s", search_value)
+    return None, product
+
+
+def stale_mirror_fallback(stale):
+    """실시간 API 조회에 실패하면 오래된 로컬 사본 항목이라도 사용"""
+    if stale is not None:
+        logger.info("[HACCP] Live API unavailable, using stale local mirror entry: %s", stale.name_or('Unknown'))
+    return stale
+
+
+@tracing.traced('haccp')
+@product_cache.cached('haccp', CACHE_TTLS['haccp'], CACHE_NEGATIVE_TTL, thread_error_count)
 def search_haccp_api(search_value):
     """HACCP API에서 검색"""
+    stale = None
+    
     try:
-        params = {
-            'serviceKey': urllib.parse.unquote(SERVICE_KEY),
-            'prdlstReportNo': search_value,
-            'returnType': 'json',
-            'numOfRows': 100,
-            'pageNo': 1
-        }
+        # ★ 로컬 사본(sync_haccp.py로 동기화)에 있으면 API 호출 없이 반환 (HACCP_MIRROR_MAX_AGE 이내) ★
+        product, stale = mirror_lookup(search_value)
         
-        print(f"[HACCP] Searching with product number: {search_value}")
-        response = requests.get(HACCP_API_URL, params=params, timeout=15)
+        if product:
+            return product
         
-        print(f"[HACCP] Status Code: {response.status_code}")
+        logger.info("[HACCP] Searching with product number: %s", search_value)
+        response = upstream_get('haccp', HACCP_API_URL, params=haccp_params(search_value))
+        
+        logger.debug("[HACCP] Status Code: %s", response.status_code)
         
         if response.status_code != 200:
-            return None
+            return stale_mirror_fallback(stale)
         
         result = response.json()
+        products = haccp_items(result)
         
-        if result.get('body') and result['body'].get('items'):
-            items = result['body']['items']
+        if products:
+            records = [from_haccp(item) for item in products]
+            product = records[0]
             
-            if isinstance(items, dict):
-                items = [items]
+            logger.info("[HACCP] ✓ Found product: %s", product.name_or('Unknown'))
             
-            first_item = items[0]
-            
-            if 'item' in first_item:
-                product = first_item['item']
-            else:
-                product = first_item
+            # 로컬 사본에 없던(또는 오래된) 제품은 다음 검색부터 로컬에서 찾도록 저장
+            haccp_mirror.upsert_many(records)
             
-            print(f"[HACCP] ✓ Found product: {product.get('prdlstNm', 'Unknown')}")
-            
-            return {
-                'source': 'HACCP',
-                'product': product
-            }
+            return product
         
         return None
         
     except Exception as e:
-        print(f"[HACCP] Error: {str(e)}")
-        return None
+        logger.warning("[HACCP] Error: %s", e)
+        return stale_mirror_fallback(stale)
 
 
-def search_foodqr_api(search_value):
-    """Food QR API에서 검색"""
-    
-    search_params_list = [
+# 검색값 형식별로 시도할 FoodQR 검색 방식 (결과가 있을 수 없는 방식은 요청하지 않음)
+FOODQR_KEYS = {
+    search_input.BARCODE: ('brcdNo',),
+    search_input.REPORT_NO: ('imrptNo',),
+    search_input.AMBIGUOUS: ('imrptNo', 'brcdNo'),
+    search_input.INVALID: ()
+}
+
+
+def foodqr_probes(search_value):
+    """FoodQR 검색 파라미터 목록 (품목보고번호 → 바코드 순서로 시도, 검색값 형식에 맞는 것만)"""
+    keys = FOODQR_KEYS[search_input.classify(search_value)]
+    probes = [
         {
             'name': 'product report number (imrptNo)',
+            'key': 'imrptNo',
             'params': {
                 'accessKey': FOODQR_ACCESS_KEY,
-                'numOfRows': 10,
+                'numOfRows': LOOKUP_ROWS,
                 'pageNo': 1,
                 '_type': 'json',
                 'imrptNo': search_value
@@ -374,91 +796,300 @@ def search_foodqr_api(search_value):
         },
         {
             'name': 'barcode (brcdNo)',
+            'key': 'brcdNo',
             'params': {
                 'accessKey': FOODQR_ACCESS_KEY,
-                'numOfRows': 10,
+                'numOfRows': LOOKUP_ROWS,
                 'pageNo': 1,
                 '_type': 'json',
                 'brcdNo': search_value
             }
         }
     ]
+    return [probe for probe in probes if probe['key'] in keys]
+
+
+class ProbeStats:
+    """
+    검색 방식(키)별 적중률
     
-    for search_info in search_params_list:
-        try:
-            search_name = search_info['name']
-            params = search_info['params']
-            
-            print(f"[FoodQR] Searching with {search_name}: {search_value}")
-            
-            response = requests.get(FOOD_QR_API_URL, params=params, timeout=15)
-            
-            print(f"[FoodQR] Status Code: {response.status_code}")
-            
-            if response.status_code != 200:
-                print(f"[FoodQR] Failed with {response.status_code}")
-                continue
-            
-            result = response.json()
-            
-            if result.get('response'):
-                response_obj = result['response']
-                
-                if response_obj.get('body'):
-                    body = response_obj['body']
-                    
-                    if body.get('items'):
-                        items = body['items']
-                        
-                        if isinstance(items, dict):
-                            if items.get('item'):
-                                product = items['item']
-                                
-                                print(f"[FoodQR] ✓ Found using {search_name}")
-                                
-                                return {
-                                    'source': 'FoodQR',
-                                    'searchMethod': search_name,
-                                    'product': product
-                                }
-                        
-                        elif isinstance(items, list) and len(items) > 0:
-                            product = items[0]
-                            
-                            if isinstance(product, dict) and product.get('item'):
-                                product = product['item']
-                            
-                            print(f"[FoodQR] ✓ Found using {search_name}")
-                            
-                            return {
-                                'source': 'FoodQR',
-                                'searchMethod': search_name,
-                                'product': product
-                            }
-            
-            print(f"[FoodQR] No items found with {search_name}")
+    동시에 여러 방식으로 검색할 수 없을 때 적중률이 높은 방식부터 시도하는 데 사용합니다.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempts = {}
+        self._hits = {}
+
+
+    def record(self, key, hit):
+        with self._lock:
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            if hit:
+                self._hits[key] = self._hits.get(key, 0) + 1
+
+
+    def hit_rate(self, key):
+        # 시도가 적을 때 한두 번의 결과로 순서가 뒤집히지 않도록 보정
+        return (self._hits.get(key, 0) + 1) / (self._attempts.get(key, 0) + 2)
+
+
+    def ordered(self, probes):
+        """적중률 높은 순서 (같으면 원래 우선순위 유지)"""
+        return sorted(probes, key=lambda probe: -self.hit_rate(probe['key']))
+
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {'attempts': attempts, 'hits': self._hits.get(key, 0)}
+                for key, attempts in self._attempts.items()
+            }
+
+
+# ★ FoodQR 검색 방식 병렬 실행 ★
+# imrptNo/brcdNo를 동시에 요청하고 우선순위 순서로 첫 결과를 사용 (전체를 마감 시각 하나로 제한)
+# FOODQR_PROBE_WORKERS: 동시에 실행할 추가 검색 수. 모두 사용 중이면 적중률 높은 방식부터 순서대로 검색
+FOODQR_PARALLEL_PROBES = os.getenv('FOODQR_PARALLEL_PROBES', '1') == '1'
+FOODQR_PROBE_WORKERS = int(os.getenv('FOODQR_PROBE_WORKERS', 16))
+foodqr_probe_executor = ThreadPoolExecutor(max_workers=FOODQR_PROBE_WORKERS, thread_name_prefix='foodqr')
+foodqr_probe_slots = threading.BoundedSemaphore(FOODQR_PROBE_WORKERS)
+foodqr_probe_stats = ProbeStats()
+
+
+def foodqr_result(search_info, product):
+    """찾은 FoodQR 제품 항목 → 레코드 (검색 방식 포함)"""
+    return from_foodqr(product, search_info['name'])
+
+
+def _foodqr_probe(search_value, search_info, deadline):
+    """FoodQR 검색 방식 하나 실행 → (제품 또는 None, 업스트림 실패 여부)"""
+    search_name = search_info['name']
+    errors = thread_error_count()
+    product = None
+    
+    try:
+        logger.info("[FoodQR] Searching with %s: %s", search_name, search_value)
+        
+        with tracing.span(f"foodqr_{search_info['key']}", search_value):
+            response = upstream_get('foodqr', FOOD_QR_API_URL, deadline=deadline, params=search_info['params'])
+        
+        logger.debug("[FoodQR] Status Code: %s", response.status_code)
+        
+        if response.status_code != 200:
+            logger.warning("[FoodQR] Failed with %s", response.status_code)
+        else:
+            product = foodqr_item(response.json())
             
-        except Exception as e:
-            print(f"[FoodQR] Error with {search_name}: {str(e)}")
-            continue
+            if product is None:
+                logger.info("[FoodQR] No items found with %s", search_name)
+            foodqr_probe_stats.record(search_info['key'], product is not None)
+            metrics.FOODQR_PROBES.labels(search_info['key'], 'hit' if product is not None else 'miss').inc()
+        
+    except Exception as e:
+        logger.warning("[FoodQR] Error with %s: %s", search_name, e)
+    
+    return product, thread_error_count() != errors
+
+
+def _acquire_probe_slots(count):
+    """추가 검색용 슬롯 count개 확보 (하나라도 부족하면 확보하지 않고 False)"""
+    for acquired in range(count):
+        if not foodqr_probe_slots.acquire(blocking=False):
+            for _ in range(acquired):
+                foodqr_probe_slots.release()
+            return False
+    return True
+
+
+def _finished_foodqr_hit(probes, futures):
+    """마감 시각까지 끝난 추가 검색 중 우선순위가 가장 높은 결과"""
+    for search_info, future in zip(probes[1:], futures):
+        if future.done():
+            product, _ = future.result()
+            if product is not None:
+                return foodqr_result(search_info, product)
+    return None
+
+
+def _foodqr_probes_parallel(search_value, probes, deadline):
+    """
+    첫 번째 방식은 현재 스레드에서, 나머지는 foodqr_probe_executor에서 동시에 검색
+    
+    우선순위 순서로 결과를 확인하므로, 앞선 방식에서 찾으면 뒤의 방식은 기다리지 않습니다.
+    (뒤의 방식이 먼저 끝나도 앞선 방식의 결과를 기다리고, 마감 시각이 지나면 끝난 결과만 사용)
+    """
+    futures = []
+    
+    for search_info in probes[1:]:
+        future = submit_with_context(foodqr_probe_executor, _foodqr_probe, search_value, search_info, deadline)
+        # 확보한 슬롯은 검색이 끝나면 반환 (마감 시각이 지나 결과를 기다리지 않은 경우도)
+        future.add_done_callback(lambda _: foodqr_probe_slots.release())
+        futures.append(future)
+    
+    product, failed = _foodqr_probe(search_value, probes[0], deadline)
+    if product is not None:
+        return foodqr_result(probes[0], product)
+    
+    # 다른 스레드에서 실패한 호출은 현재 스레드에 반영 (실패로 인한 None은 캐시하지 않도록)
+    for search_info, future in zip(probes[1:], futures):
+        try:
+            product, failed = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning("[FoodQR] Deadline exceeded waiting for %s", search_info['name'])
+            count_thread_error()
+            return _finished_foodqr_hit(probes, futures)
+        
+        if failed:
+            count_thread_error()
+        
+        if product is not None:
+            return foodqr_result(search_info, product)
+    
+    return None
+
+
+def _foodqr_probes_sequential(search_value, probes, deadline):
+    """적중률 높은 방식부터 하나씩 검색 (마감 시각이 지나면 중단)"""
+    for search_info in foodqr_probe_stats.ordered(probes):
+        if time.monotonic() >= deadline:
+            logger.warning("[FoodQR] Deadline exceeded before %s", search_info['name'])
+            count_thread_error()
+            return None
+        
+        product, _ = _foodqr_probe(search_value, search_info, deadline)
+        if product is not None:
+            return foodqr_result(search_info, product)
     
-    print(f"[FoodQR] ✗ All search methods failed")
     return None
 
 
-def extract_product_info_foodqr(product):
-    """Food QR API 응답에서 제품 정보 추출"""
+@tracing.traced('foodqr')
+@product_cache.cached('foodqr', CACHE_TTLS['foodqr'], CACHE_NEGATIVE_TTL, thread_error_count)
+def search_foodqr_api(search_value):
+    """Food QR API에서 검색 (검색 방식이 여럿이면 동시에 요청)"""
+    probes = foodqr_probes(search_value)
+    deadline = upstream_deadline('foodqr')
+    
+    if len(probes) > 1 and FOODQR_PARALLEL_PROBES and _acquire_probe_slots(len(probes) - 1):
+        result = _foodqr_probes_parallel(search_value, probes, deadline)
+    else:
+        result = _foodqr_probes_sequential(search_value, probes, deadline)
+    
+    if result is not None:
+        logger.info("[FoodQR] ✓ Found using %s", result.search_method)
+        return result
+    
+    logger.info("[FoodQR] ✗ All search methods failed")
+    return None
+
+
+def _upstream_stream(source, url, parse, **kwargs):
+    """
+    업스트림 응답 본문을 받는 대로 parse(조각, meta)로 파싱 → (행 반복자, meta)
+    
+    본문은 행을 읽을 때 조금씩 받으며, 다 읽거나 중간에 멈추면 응답을 닫습니다.
+    (서킷 브레이커에는 응답 헤더까지의 시간과 상태 코드가 기록됨)
+    """
+    response = upstream_get(source, url, stream=True, **kwargs)
+    
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    
+    meta = {}
+    
+    def rows():
+        with response:
+            yield from parse(response.iter_content(CHUNK_SIZE), meta)
+    
+    return rows(), meta
+
+
+def iter_haccp_products(search_value=None, page_size=None, limit=None):
+    """
+    ★ 여러 행이 필요한 HACCP 조회 (제품 목록/브라우저용) ★
+    
+    페이지를 필요할 때 하나씩 요청하고, 응답도 스트리밍으로 파싱하여 제품을 하나씩 반환합니다.
+    search_value가 없으면 전체 목록을 순회합니다.
+    """
+    def fetch_page(page_no, num_of_rows):
+        params = haccp_params(search_value, num_of_rows, page_no)
+        if search_value is None:
+            del params['prdlstReportNo']
+        return _upstream_stream('haccp', HACCP_API_URL, iter_haccp_stream, params=params)
+    
+    return iter_pages(fetch_page, page_size or LIST_PAGE_SIZES['haccp'], limit)
+
+
+def iter_foodqr_items(key, value, page_size=None, limit=None):
+    """여러 행이 필요한 FoodQR 조회 (key: imrptNo 또는 brcdNo)"""
+    def fetch_page(page_no, num_of_rows):
+        params = {
+            'accessKey': FOODQR_ACCESS_KEY,
+            'numOfRows': num_of_rows,
+            'pageNo': page_no,
+            '_type': 'json',
+            key: value
+        }
+        return _upstream_stream('foodqr', FOOD_QR_API_URL, iter_foodqr_stream, params=params)
     
-    product_name = product.get('prdctNm', 'Unknown Product')
+    return iter_pages(fetch_page, page_size or LIST_PAGE_SIZES['foodqr'], limit)
+
+
+def iter_c005_rows(barcode, page_size=None, limit=None):
+    """여러 행이 필요한 C005 조회 (같은 바코드의 모든 품목)"""
+    def fetch_page(page_no, num_of_rows):
+        start = (page_no - 1) * num_of_rows + 1
+        return _upstream_stream('c005', c005_url(barcode, start, start + num_of_rows - 1), iter_c005_stream)
     
-    raw_html = product.get('prvwCn', '')
+    return iter_pages(fetch_page, page_size or LIST_PAGE_SIZES['c005'], limit)
+
+
+@app.before_request
+def assign_request_id():
+    """요청마다 ID를 부여하여 모든 로그에 포함 (X-Request-ID 헤더가 있으면 그대로 사용)"""
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+    g.request_id_token = request_id_var.set(g.request_id)
+
+
+@app.after_request
+def add_request_id_header(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '-')
+    return response
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.monotonic()
+    g.trace_token = tracing.start_trace()
+
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
     
-    raw_materials = strip_html(raw_html) if raw_html else ''
+    if 'request_started' in g:
+        metrics.REQUEST_LATENCY.labels(endpoint).observe(time.monotonic() - g.request_started)
+    metrics.REQUESTS.labels(endpoint, request.method, response.status_code).inc()
     
-    print(f"[FoodQR Extract] Product Name: {product_name}")
-    print(f"[FoodQR Extract] Raw Materials length: {len(raw_materials) if raw_materials else 0}")
+    # 단계별 소요 시간 (브라우저 개발자 도구 Network 탭의 Timing에서 확인 가능)
+    trace = tracing.current_trace.get()
+    if trace is not None and trace.spans:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def reset_request_id(exc):
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        request_id_var.reset(token)
     
-    return product_name, raw_materials
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracing.current_trace.reset(token)
 
 
 @app.route('/test', methods=['GET'])
@@ -469,163 +1100,407 @@ def test():
         'SERVICE_KEY_set': SERVICE_KEY is not None,
         'FOODQR_ACCESS_KEY_set': FOODQR_ACCESS_KEY is not None,
         'FOOD_SAFETY_API_KEY_set': FOOD_SAFETY_API_KEY is not None,
-        'SUPABASE_set': SUPABASE_URL is not None and SUPABASE_KEY is not None
+        'SUPABASE_set': SUPABASE_URL is not None and SUPABASE_KEY is not None,
+        'circuits': {name: breaker.snapshot() for name, breaker in circuit_breakers.items()},
+        'foodqrProbes': foodqr_probe_stats.snapshot()
     })
 
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """라이브니스 프로브 (프로세스가 요청을 처리할 수 있는지만 확인, 외부 서비스는 확인하지 않음)"""
+    return jsonify({'status': 'ok'})
+
+
+def readiness_checks():
+    """레디니스 항목별 결과 {이름: {'ok': bool, ...}}"""
+    checks = {}
+    
+    try:
+        get_supabase()
+        checks['supabase'] = {'ok': True, 'circuit': circuit_breakers['supabase'].state}
+        checks['customProductsSchema'] = custom_products_schema_check()
+    except SupabaseUnavailable as e:
+        checks['supabase'] = {'ok': False, 'error': str(e)}
+    
+    stores = {'localStore': haccp_mirror}
+    if product_cache.backend is not None:
+        stores['productCache'] = product_cache.backend
+    
+    for name, store in stores.items():
+        try:
+            store.ping()
+            checks[name] = {'ok': True}
+        except Exception as e:
+            checks[name] = {'ok': False, 'error': str(e)}
+    
+    return checks
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    레디니스 프로브 (트래픽을 받을 준비가 되었는지)
+    
+    Supabase 클라이언트를 이 때 만들어 두므로 첫 검색 요청이 생성 비용을 내지 않습니다.
+    업스트림 장애(서킷 열림)는 다른 출처로 응답할 수 있으므로 준비 안 됨으로 보지 않습니다.
+    """
+    checks = readiness_checks()
+    ready = all(check['ok'] for check in checks.values())
+    return jsonify({'status': 'ready' if ready else 'not_ready', 'checks': checks}), 200 if ready else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 수집 엔드포인트"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 
+def _ingredient_payload(product_name, source, raw_materials, missing_message=None, found_ingredients=None, **extra):
+    """검색 결과 JSON 페이로드 생성 (found_ingredients가 주어지면 다시 분석하지 않음)"""
+    if not raw_materials:
+        if missing_message is None:
+            return None
+        return {
+            'productName': product_name,
+            'source': source,
+            'foundIngredients': {},
+            'rawMaterials': missing_message,
+            **extra
+        }
+    
+    return {
+        'productName': product_name,
+        'source': source,
+        'rawMaterials': raw_materials,
+        'foundIngredients': find_ingredients(raw_materials) if found_ingredients is None else found_ingredients,
+        **extra
+    }
+
+
+def custom_database_payload(product):
+    """Supabase 제품 레코드 → 응답 페이로드 (저장된 분석 결과가 최신이면 그대로 사용)"""
+    found_ingredients = None
+    
+    if product.matcher_version == ingredient_matcher.version:
+        found_ingredients = product.found_ingredients
+    else:
+        refresh_stored_analysis(product)
+    
+    return _ingredient_payload(
+        product.name_or('Unknown'),
+        product.source,
+        product.raw_materials,
+        found_ingredients=found_ingredients
+    )
+
+
+def haccp_payload(product):
+    """HACCP 제품 레코드 → 응답 페이로드"""
+    return _ingredient_payload(
+        product.name_or('Unknown Product'),
+        'HACCP',
+        product.raw_materials,
+        missing_message='No ingredient information available.'
+    )
+
+
+def foodqr_payload(product):
+    """FoodQR 제품 레코드 → 응답 페이로드"""
+    return _ingredient_payload(
+        product.name_or('Unknown Product'),
+        f'Food QR (e-Label) - {product.search_method or "unknown"}',
+        product.raw_materials,
+        missing_message='No ingredient information available.'
+    )
+
+
+def mapping_info(search_value, barcode_mapping):
+    return f"Barcode {search_value} → Product No. {barcode_mapping['product_report_no']}"
+
+
+def mapped_haccp_payload(barcode_mapping, product, info):
+    """매핑된 품목보고번호의 HACCP 제품 레코드 → 응답 페이로드 (원재료 정보가 없으면 None)"""
+    return _ingredient_payload(
+        product.name_or(barcode_mapping['product_name']),
+        'HACCP (via C005 Barcode Mapping)',
+        product.raw_materials,
+        mappingInfo=info
+    )
+
+
+def mapped_foodqr_payload(product, info):
+    """매핑된 품목보고번호의 FoodQR 제품 레코드 → 응답 페이로드 (원재료 정보가 없으면 None)"""
+    return _ingredient_payload(
+        product.name_or('Unknown Product'),
+        'FoodQR (via C005 Barcode Mapping)',
+        product.raw_materials,
+        mappingInfo=info
+    )
+
+
+def mapping_basic_payload(barcode_mapping):
+    """C005에서 제품명은 찾았지만 원재료 정보가 없는 경우"""
+    return {
+        'productName': barcode_mapping['product_name'],
+        'source': 'C005 Barcode Link API (Basic Info Only)',
+        'foundIngredients': {},
+        'rawMaterials': 'Product found via barcode, but detailed ingredient information is not available.',
+        'manufacturer': barcode_mapping['manufacturer'],
+        'productType': barcode_mapping['product_type']
+    }
+
+
+def stage_custom_database(search_value):
+    """1차: Supabase 검색 (가장 빠름!)"""
+    product = search_custom_database(search_value)
+    return custom_database_payload(product) if product else None
+
+
+def stage_haccp(search_value):
+    """2차: HACCP API 검색"""
+    product = search_haccp_api(search_value)
+    return haccp_payload(product) if product else None
+
+
+def stage_foodqr(search_value):
+    """3차: Food QR API 검색"""
+    product = search_foodqr_api(search_value)
+    return foodqr_payload(product) if product else None
+
+
+def stage_barcode_link(search_value):
+    """★ 4차: 88로 시작하는 바코드인 경우 C005 API로 품목번호 찾기 ★"""
+    barcode_mapping = search_barcode_link_api(search_value)
+    
+    if not barcode_mapping:
+        return None
+    
+    return _resolve_barcode_mapping(search_value, barcode_mapping)
+
+
+def stage_stored_mapping(search_value):
+    """저장된 바코드 매핑으로 바로 품목보고번호 검색"""
+    barcode_mapping = barcode_mapping_store.get(search_value)
+    
+    if not barcode_mapping:
+        return stage_barcode_link(search_value)
+    
+    if barcode_mapping_store.is_stale(barcode_mapping) and barcode_mapping_store.claim_refresh(search_value):
+        logger.info("[Mapping] Stale mapping for %s, refreshing in background", search_value)
+        submit_with_context(search_executor, search_barcode_link_api.uncached, search_value)
+    
+    return _resolve_barcode_mapping(search_value, barcode_mapping)
+
+
+def _resolve_barcode_mapping(search_value, barcode_mapping):
+    """바코드 매핑의 품목보고번호로 HACCP → FoodQR 재검색"""
+    product_report_no = barcode_mapping['product_report_no']
+    info = mapping_info(search_value, barcode_mapping)
+    logger.info("[Search] Step 5: Retrying with product report number: %s", product_report_no)
+    
+    # 5차: 찾은 품목보고번호로 HACCP 재검색
+    logger.debug("[Search] Step 5-1: Retrying HACCP with mapped product number...")
+    haccp_retry = search_haccp_api(product_report_no)
+    
+    if haccp_retry:
+        payload = mapped_haccp_payload(barcode_mapping, haccp_retry, info)
+        if payload:
+            return payload
+    
+    # 6차: FoodQR 재검색
+    logger.debug("[Search] Step 5-2: Retrying FoodQR with mapped product number...")
+    foodqr_retry = search_foodqr_api(product_report_no)
+    
+    if foodqr_retry:
+        payload = mapped_foodqr_payload(foodqr_retry, info)
+        if payload:
+            return payload
+    
+    return mapping_basic_payload(barcode_mapping)
+
+
+def search_stage_names(search_value):
+    """
+    검색값에 해당하는 단계 이름 목록 (우선순위 순서, 동기/비동기 모드 공용)
+    
+    ★ 검색값 형식(search_input.classify)에 따라 결과가 있을 수 없는 단계는 건너뜀 ★
+    - 바코드: HACCP 품목보고번호 검색 제외
+    - 품목보고번호: C005 바코드 매핑 제외 (FoodQR도 imrptNo로만 검색)
+    - 잘못된 입력: 사용자가 추가한 제품(Supabase)만 검색
+    """
+    kind = search_input.classify(search_value)
+    metrics.SEARCH_INPUTS.labels(kind).inc()
+    logger.debug("[Search] Input kind: %s", kind)
+    
+    if kind == search_input.INVALID:
+        return ['custom_database']
+    
+    if search_value.startswith('88') and kind == search_input.BARCODE:
+        # 이전에 C005로 찾은 바코드는 C005 호출만 건너뜀
+        # (FoodQR 바코드 검색은 유지: 매핑된 품목보고번호로는 찾을 수 없는 제품이 있으므로 첫 검색과 같은 순서)
+        if barcode_mapping_store.get(search_value):
+            logger.info("[Search] Stored mapping found for %s", search_value)
+            return ['custom_database', 'foodqr', 'stored_mapping']
+        
+        return ['custom_database', 'foodqr', 'barcode_link']
+    
+    if kind == search_input.BARCODE:
+        return ['custom_database', 'foodqr']
+    
+    return ['custom_database', 'haccp', 'foodqr']
+
+
+SEARCH_STAGES = {
+    'custom_database': stage_custom_database,
+    'haccp': stage_haccp,
+    'foodqr': stage_foodqr,
+    'barcode_link': stage_barcode_link,
+    'stored_mapping': stage_stored_mapping
+}
+
+
+def search_stages_for(search_value):
+    """검색값에 해당하는 단계 함수 목록 (우선순위 순서)"""
+    return [SEARCH_STAGES[name] for name in search_stage_names(search_value)]
+
+
+def resolve_product(search_value):
+    """
+    ★ 모든 검색 단계를 병렬로 실행하고 우선순위 순서로 첫 결과 반환 ★
+    
+    각 단계는 독립적이므로 동시에 요청하고, 기존 순서(Supabase → HACCP → FoodQR → C005)
+    대로 결과를 확인합니다. 결과가 확정되면 아직 시작하지 않은 단계는 취소합니다.
+    """
+    stages = search_stages_for(search_value)
+    futures = [submit_with_context(search_executor, stage, search_value) for stage in stages]
+    
+    try:
+        for stage, future in zip(stages, futures):
+            payload = future.result()
+            
+            if payload:
+                logger.info("[Search] ✓ Resolved by %s", stage.__name__)
+                metrics.SEARCH_RESOLVED.labels(stage.__name__.replace('stage_', '', 1)).inc()
+                return payload
+        
+        metrics.SEARCH_RESOLVED.labels('not_found').inc()
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def search_result(search_value):
+    """검색값 하나를 처리하여 (응답 본문, HTTP 상태 코드) 반환"""
+    try:
+        # 같은 검색값이 이미 처리 중이면 새로 검색하지 않고 그 결과를 기다림
+        with tracing.span('resolve') as span_result:
+            payload, shared = search_flight.do(search_value, resolve_product, search_value)
+            span_result['outcome'] = 'shared' if shared else 'leader'
+        
+        if shared:
+            logger.info("[Search] Joined in-flight lookup")
+            metrics.SEARCH_COALESCED.inc()
+        
+        if payload:
+            return payload, 200
+        
+        logger.info("[Search] All sources returned no results")
+        return {'error': 'Product not found in any database.'}, 404
+        
+    except requests.exceptions.Timeout:
+        return {'error': 'API request timeout. Please try again.'}, 504
+    except Exception as e:
+        logger.exception("[Search Error] %s", e)
+        return {'error': 'Server error'}, 500
+
+
 @app.route('/search', methods=['POST'])
 def search_product():
     data = request.get_json()
     search_value = data.get('searchValue', '').strip()
     
-    print(f"\n{'='*60}")
-    print(f"Search request: {search_value}")
-    print(f"{'='*60}")
+    logger.info("Search request: %s", search_value)
     
     if not search_value:
         return jsonify({'error': 'Please enter a product number or barcode'}), 400
     
-    try:
-        # 1차: Supabase 검색 (가장 빠름!)
-        print("[Search] Step 1: Searching Supabase...")
-        supabase_result = search_custom_database(search_value)
-        
-        if supabase_result:
-            product = supabase_result['product']
-            product_name = product.get('prdctNm', 'Unknown')
-            raw_materials = product.get('prvwCn', '')
-            
-            if raw_materials:
-                found_ingredients = find_ingredients(raw_materials)
-                return jsonify({
-                    'productName': product_name,
-                    'source': supabase_result['source'],
-                    'rawMaterials': raw_materials,
-                    'foundIngredients': found_ingredients
-                })
-        
-        # 2차: HACCP API 검색
-        print("[Search] Step 2: Searching HACCP API...")
-        haccp_result = search_haccp_api(search_value)
-        
-        if haccp_result:
-            product = haccp_result['product']
-            product_name = product.get('prdlstNm', 'Unknown Product')
-            raw_materials = product.get('rawmtrl', '')
-            
-            if not raw_materials:
-                return jsonify({
-                    'productName': product_name,
-                    'source': 'HACCP',
-                    'foundIngredients': {},
-                    'rawMaterials': 'No ingredient information available.',
-                })
-            
-            found_ingredients = find_ingredients(raw_materials)
-            return jsonify({
-                'productName': product_name,
-                'source': 'HACCP',
-                'rawMaterials': raw_materials,
-                'foundIngredients': found_ingredients
-            })
-        
-        # 3차: Food QR API 검색
-        print("[Search] Step 3: Searching Food QR API...")
-        foodqr_result = search_foodqr_api(search_value)
-        
-        if foodqr_result:
-            product = foodqr_result['product']
-            search_method = foodqr_result.get('searchMethod', 'unknown')
-            product_name, raw_materials = extract_product_info_foodqr(product)
-            
-            if not raw_materials:
-                return jsonify({
-                    'productName': product_name,
-                    'source': f'Food QR (e-Label) - {search_method}',
-                    'foundIngredients': {},
-                    'rawMaterials': 'No ingredient information available.',
-                })
-            
-            found_ingredients = find_ingredients(raw_materials)
-            return jsonify({
-                'productName': product_name,
-                'source': f'Food QR (e-Label) - {search_method}',
-                'rawMaterials': raw_materials,
-                'foundIngredients': found_ingredients
-            })
-        
-        # ★ 4차: 88로 시작하는 바코드인 경우 C005 API로 품목번호 찾기 ★
-        if search_value.startswith('88'):
-            print("[Search] Step 4: Barcode detected (88 prefix) - trying C005 API...")
-            
-            barcode_mapping = search_barcode_link_api(search_value)
-            
-            if barcode_mapping:
-                product_report_no = barcode_mapping['product_report_no']
-                print(f"[Search] Step 5: Retrying with product report number: {product_report_no}")
-                
-                # 5차: 찾은 품목보고번호로 HACCP 재검색
-                print("[Search] Step 5-1: Retrying HACCP with mapped product number...")
-                haccp_retry = search_haccp_api(product_report_no)
-                
-                if haccp_retry:
-                    product = haccp_retry['product']
-                    product_name = product.get('prdlstNm', barcode_mapping['product_name'])
-                    raw_materials = product.get('rawmtrl', '')
-                    
-                    if raw_materials:
-                        found_ingredients = find_ingredients(raw_materials)
-                        return jsonify({
-                            'productName': product_name,
-                            'source': 'HACCP (via C005 Barcode Mapping)',
-                            'rawMaterials': raw_materials,
-                            'foundIngredients': found_ingredients,
-                            'mappingInfo': f"Barcode {search_value} → Product No. {product_report_no}"
-                        })
-                
-                # 6차: FoodQR 재검색
-                print("[Search] Step 5-2: Retrying FoodQR with mapped product number...")
-                foodqr_retry = search_foodqr_api(product_report_no)
-                
-                if foodqr_retry:
-                    product = foodqr_retry['product']
-                    product_name, raw_materials = extract_product_info_foodqr(product)
-                    
-                    if raw_materials:
-                        found_ingredients = find_ingredients(raw_materials)
-                        return jsonify({
-                            'productName': product_name,
-                            'source': 'FoodQR (via C005 Barcode Mapping)',
-                            'rawMaterials': raw_materials,
-                            'foundIngredients': found_ingredients,
-                            'mappingInfo': f"Barcode {search_value} → Product No. {product_report_no}"
-                        })
-                
-                # C005에서 제품명은 찾았지만 원재료 정보가 없는 경우
-                return jsonify({
-                    'productName': barcode_mapping['product_name'],
-                    'source': 'C005 Barcode Link API (Basic Info Only)',
-                    'foundIngredients': {},
-                    'rawMaterials': 'Product found via barcode, but detailed ingredient information is not available.',
-                    'manufacturer': barcode_mapping['manufacturer'],
-                    'productType': barcode_mapping['product_type']
-                })
-        
-        print("[Search] All sources returned no results")
-        return jsonify({'error': 'Product not found in any database.'}), 404
+    body, status = search_result(search_value)
+    
+    # ?debug=1 또는 {"debug": true}: 단계별 소요 시간을 응답에 포함
+    if request.args.get('debug') or data.get('debug'):
+        body = {**body, 'debug': {'spans': tracing.current_trace.get().to_list()}}
+    
+    return jsonify(body), status
+
+
+def batch_search_values(search_values):
+    """
+    /search/batch 입력 정리 → 항목별 검색값 목록
+
+    문자열이 아닌 항목(null, 숫자 등)은 None으로 표시하여 검색하지 않습니다.
+    (str()로 바꾸면 null이 "None"으로 조회됨)
+    """
+    return [value.strip() if isinstance(value, str) else None for value in search_values]
+
+
+def batch_item_error(search_value):
+    """검색하지 않은 /search/batch 항목의 (응답 본문, HTTP 상태 코드)"""
+    if search_value is None:
+        return {'error': 'searchValues items must be strings'}, 400
+    return {'error': 'Please enter a product number or barcode'}, 400
+
+
+@app.route('/search/batch', methods=['POST'])
+def search_product_batch():
+    """
+    ★ 여러 바코드/품목보고번호를 한 번에 검색 ★
+    
+    요청: {"searchValues": ["8801234567890", "19780614002123", ...]}
+    응답: 입력 순서대로 항목별 결과 (일부 실패 허용)
+    중복 값은 한 번만 검색하고, 각 출처 조회는 캐시를 통해 배치 전체에서 공유됩니다.
+    """
+    data = request.get_json(silent=True) or {}
+    search_values = data.get('searchValues')
+    
+    if not isinstance(search_values, list) or not search_values:
+        return jsonify({'error': 'searchValues must be a non-empty list'}), 400
+    
+    if len(search_values) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many items (max {BATCH_MAX_ITEMS})'}), 400
+    
+    raw_values, search_values = search_values, batch_search_values(search_values)
+    unique_values = list(dict.fromkeys(value for value in search_values if value))
+    
+    logger.info("[Batch] %d items, %d unique", len(search_values), len(unique_values))
+    
+    # Supabase는 항목별로 조회하지 않고 한 번에 조회
+    search_custom_database_batch(unique_values)
+    
+    futures = [submit_with_context(batch_executor, search_result, value) for value in unique_values]
+    results = {value: future.result() for value, future in zip(unique_values, futures)}
+    
+    items = []
+    for raw_value, search_value in zip(raw_values, search_values):
+        if not search_value:
+            body, status = batch_item_error(search_value)
+        else:
+            body, status = results[search_value]
         
-    except requests.exceptions.Timeout:
-        return jsonify({'error': 'API request timeout. Please try again.'}), 504
-    except Exception as e:
-        print(f"[Search Error] {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': 'Server error'}), 500
+        items.append({'searchValue': raw_value if search_value is None else search_value, 'status': status, **body})
+    
+    return jsonify({
+        'count': len(items),
+        'found': sum(1 for item in items if item['status'] == 200),
+        'results': items
+    })
 
 
 @app.route('/add-product', methods=['POST'])
@@ -645,14 +1520,22 @@ def add_product():
         if not barcode and not imrpt_no:
             return jsonify({'error': 'Barcode or imrptNo required'}), 400
         
-        response = supabase.table('custom_products').insert({
+        # 원재료 분석은 추가할 때 한 번만 하고 함께 저장 (검색 시 다시 분석하지 않음)
+        response = get_supabase().table('custom_products').insert({
             'barcode': barcode if barcode else None,
             'imrpt_no': imrpt_no if imrpt_no else None,
             'product_name': product_name,
-            'raw_materials': raw_materials
+            'raw_materials': raw_materials,
+            **allergen_analysis(raw_materials)
         }).execute()
         
-        print(f"[Supabase] Product added: {product_name}")
+        logger.info("[Supabase] Product added: %s", product_name)
+        
+        # 새로 추가된 제품이 캐시된 검색 실패 결과에 가려지지 않도록 무효화
+        for key in (barcode, imrpt_no):
+            if key:
+                product_cache.invalidate('supabase', key)
+        allergen_index.invalidate()
         
         return jsonify({
             'status': 'success',
@@ -660,10 +1543,55 @@ def add_product():
         }), 201
         
     except Exception as e:
-        print(f"[Supabase Error] {str(e)}")
+        logger.exception("[Supabase Error] %s", e)
         return jsonify({'error': f'Failed to add product: {str(e)}'}), 500
 
 
+def _allergen_categories(value):
+    """쉼표로 구분된 알레르기 성분 이름 → (카테고리 목록, 알 수 없는 이름 목록)"""
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    categories = [ALLERGEN_CATEGORY_NAMES.get(name.lower()) for name in names]
+    unknown = [name for name, category in zip(names, categories) if category is None]
+    return [category for category in categories if category], unknown
+
+
+@app.route('/api/allergen-filter', methods=['GET'])
+def allergen_filter():
+    """
+    ★ 알레르기 성분 포함/제외 조건으로 제품 조회 ★
+    
+    예: /api/allergen-filter?exclude=대두,우유&offset=0&limit=50
+    include: 모두 포함하는 제품, exclude: 하나도 포함하지 않는 제품 (한글 또는 영문 이름)
+    """
+    include, unknown_include = _allergen_categories(request.args.get('include'))
+    exclude, unknown_exclude = _allergen_categories(request.args.get('exclude'))
+    
+    if unknown_include or unknown_exclude:
+        return jsonify({'error': f"Unknown allergen: {', '.join(unknown_include + unknown_exclude)}"}), 400
+    
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 50, type=int)), ALLERGEN_FILTER_MAX_LIMIT)
+    
+    try:
+        index = allergen_index.get()
+    except Exception as e:
+        logger.exception("[Index] Failed to build allergen index: %s", e)
+        return jsonify({'error': 'Allergen index is not available. Please try again.'}), 503
+    
+    total, items = index.query(include, exclude, offset, limit)
+    
+    return jsonify({
+        'include': include,
+        'exclude': exclude,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'items': items,
+        'indexedProducts': index.size,
+        'indexBuiltAt': datetime.fromtimestamp(index.built_at).isoformat(timespec='seconds')
+    })
+
+
 @app.route('/about')
 def about():
     return render_template('about.html')
@@ -697,7 +1625,7 @@ def request_product():
             return jsonify({'error': '상품명은 필수입니다.'}), 400
         
         # Supabase에 저장
-        response = supabase.table('product_requests').insert({
+        response = get_supabase().table('product_requests').insert({
             'product_name': product_name,
             'product_code': product_code if product_code else None,
             'barcode': barcode if barcode else None
@@ -709,7 +1637,7 @@ def request_product():
         }), 201
         
     except Exception as e:
-        print(f"[Product Request Error] {str(e)}")
+        logger.exception("[Product Request Error] %s", e)
         return jsonify({'error': 'Failed to save request'}), 500
 
 
@@ -724,7 +1652,7 @@ def get_product_requests():
     try:
         limit = request.args.get('limit', 10, type=int)
         
-        response = supabase.table('product_requests')\
+        response = get_supabase().table('product_requests')\
             .select('*')\
             .order('created_at', desc=True)\
             .limit(limit)\
@@ -737,7 +1665,53 @@ def get_product_requests():
 def inject_year():
     return {'year': datetime.now().year}
 
+
+def warm_up():
+    """
+    fork 전에 해 두어도 안전한 준비 작업 (gunicorn preload 모드)
+    
+    네트워크 연결이나 스레드는 만들지 않고, 워커들이 공유할 모듈만 미리 불러옵니다.
+    """
+    import supabase  # noqa: F401
+    
+    # 로컬 저장소 파일을 미리 열어 스키마 생성 (열 수 없어도 시작은 계속하고 /readyz가 보고)
+    try:
+        haccp_mirror.ping()
+    except sqlite3.Error as e:
+        logger.warning("[Startup] Local store unavailable: %s", e)
+    logger.info("[Startup] Warmed up for preload")
+
+
+def reset_after_fork():
+    """
+    ★ fork된 워커에서 부모 프로세스의 스레드/연결 상태 정리 (gunicorn post_fork) ★
+    
+    SQLite 연결과 공공 API 세션은 pid를 확인하여 워커에서 새로 만들고,
+    Supabase 클라이언트도 LazyClient가 워커에서 다시 만듭니다.
+    """
+    restart_after_fork()
+    supabase_client.reset()
+
+
+def create_app(preload=False):
+    """
+    ★ 애플리케이션 팩토리 (gunicorn 'app:create_app()') ★
+    
+    모듈을 불러올 때는 외부 서비스에 연결하지 않으므로 설정이 없어도 워커가 시작되고,
+    준비 상태는 /readyz로 확인합니다. preload=True이면 fork 전에 warm_up()을 실행합니다.
+    """
+    logger.info(
+        "Environment Check: SERVICE_KEY=%s FOODQR_ACCESS_KEY=%s FOOD_SAFETY_API_KEY=%s SUPABASE_URL=%s SUPABASE_KEY=%s",
+        *('✓ SET' if value else '✗ NOT SET'
+          for value in (SERVICE_KEY, FOODQR_ACCESS_KEY, FOOD_SAFETY_API_KEY, SUPABASE_URL, SUPABASE_KEY))
+    )
+    
+    if preload:
+        warm_up()
+    return app
+
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5000))
-    app.run(debug=os.getenv('FLASK_ENV') == 'development', host='0.0.0.0', port=port)
+    create_app().run(debug=os.getenv('FLASK_ENV') == 'development', host='0.0.0.0', port=port)
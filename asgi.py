@@ -0,0 +1,728 @@
+"""
+★ 비동기(ASGI) 실행 모드 ★
+
+/search, /search/batch를 이벤트 루프의 코루틴으로 처리합니다.
+업스트림 호출은 httpx.AsyncClient를 사용하므로 워커 프로세스 하나가 스레드 수와 관계없이
+수백 개의 검색을 동시에 기다릴 수 있습니다.
+나머지 경로(/, /add-product, /test, /metrics)는 기존 Flask 앱을 그대로 사용합니다.
+
+실행:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker -w 2
+
+설정, 캐시, 로컬 저장소, 서킷 브레이커, 응답 형식(JSON)은 app.py와 공유합니다.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+import urllib.parse
+import uuid
+from functools import wraps
+
+import httpx
+from a2wsgi import WSGIMiddleware
+
+import app as core
+import metrics
+import tracing
+from circuit_breaker import CircuitOpenError
+from food_apis import haccp_items, foodqr_item, c005_result, c005_mapping
+from log_config import request_id_var
+from product_cache import MISSING
+from product_record import from_custom_product, from_haccp
+from single_flight import AsyncSingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+# 워커당 업스트림 동시 연결 수 (스레드가 아니라 연결 수가 동시 검색 수의 상한)
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 200))
+# Flask 경로(/add-product 등)를 처리할 스레드 수
+ASYNC_WSGI_THREADS = int(os.getenv('ASYNC_WSGI_THREADS', 10))
+
+
+_http_client = None
+
+
+def http_client():
+    """워커(이벤트 루프)당 하나의 httpx.AsyncClient (첫 사용 시 생성)"""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=core.http_pool.pool_maxsize
+            ),
+            timeout=httpx.Timeout(core.http_pool.read_timeout, connect=core.http_pool.connect_timeout)
+        )
+
+    return _http_client
+
+
+# 검색 함수 한 번의 호출 중 실패한 업스트림 호출 수 (스레드 모드의 thread_error_count 대신)
+_lookup_errors = contextvars.ContextVar('lookup_errors', default=None)
+
+
+def _count_error():
+    errors = _lookup_errors.get()
+    if errors is not None:
+        errors[0] += 1
+
+
+async def upstream_request(source, method, url, deadline=None, **kwargs):
+    """서킷 브레이커를 거쳐 업스트림 호출 (app.call_upstream의 비동기 버전, deadline은 app.upstream_get과 같음)"""
+    breaker = core.circuit_breakers[source]
+
+    if not breaker.allow():
+        metrics.UPSTREAM_ERRORS.labels(source, 'circuit_open').inc()
+        _count_error()
+        raise CircuitOpenError(f'{source} circuit is open')
+
+    read_timeout = breaker.read_timeout()
+    if deadline is not None:
+        read_timeout = max(0.1, min(read_timeout, deadline - time.monotonic()))
+
+    timeout = httpx.Timeout(read_timeout, connect=core.http_pool.connect_timeout)
+    started = time.monotonic()
+
+    try:
+        response = await http_client().request(method, url, timeout=timeout, **kwargs)
+    except (Exception, asyncio.CancelledError) as e:
+        # 취소된 호출도 실패로 기록 (half-open 시험 호출이었다면 기록해야 다음 시험 호출이 허용됨)
+        latency = time.monotonic() - started
+        breaker.record(latency, False)
+        metrics.UPSTREAM_LATENCY.labels(source).observe(latency)
+        if isinstance(e, asyncio.CancelledError):
+            kind = 'cancelled'
+        else:
+            kind = 'timeout' if isinstance(e, httpx.TimeoutException) else 'error'
+        metrics.UPSTREAM_ERRORS.labels(source, kind).inc()
+        _count_error()
+        raise
+
+    latency = time.monotonic() - started
+    ok = response.status_code < 500
+    breaker.record(latency, ok)
+    metrics.UPSTREAM_LATENCY.labels(source).observe(latency)
+
+    if not ok:
+        metrics.UPSTREAM_ERRORS.labels(source, 'http_5xx').inc()
+        _count_error()
+
+    return response
+
+
+# ★ SQLite 호출(로컬 사본, 바코드 매핑, 공유 캐시)은 asyncio.to_thread로 실행 ★
+# 다른 워커가 쓰는 중이면 busy timeout(최대 5초)까지 기다릴 수 있으므로, 이벤트 루프에서 직접 호출하지 않음
+async def cache_call(method, *args):
+    """product_cache 메서드 호출 (공유 SQLite 백엔드가 있을 때만 스레드에서 실행)"""
+    if core.product_cache.backend is None:
+        return method(*args)
+    return await asyncio.to_thread(method, *args)
+
+
+def cached(source):
+    """ProductCache.cached의 비동기 버전 (오류가 있었던 None 결과는 캐시하지 않음)"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(search_value):
+            result = await cache_call(core.product_cache.get, source, search_value)
+
+            if result is not MISSING:
+                return result
+
+            errors = [0]
+            token = _lookup_errors.set(errors)
+            try:
+                result = await func(search_value)
+            finally:
+                _lookup_errors.reset(token)
+
+            if result is not None:
+                await cache_call(core.product_cache.set, source, search_value, result, core.CACHE_TTLS[source])
+            elif not errors[0]:
+                await cache_call(core.product_cache.set, source, search_value, result, core.CACHE_NEGATIVE_TTL)
+
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+# 백그라운드 작업 (취소되거나 GC되지 않도록 참조 유지)
+_background_tasks = set()
+
+
+def _discard_background_task(task):
+    _background_tasks.discard(task)
+
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("[Async] Background task failed: %s", task.exception())
+
+
+def run_in_background(coro):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_discard_background_task)
+    return task
+
+
+def _supabase_headers():
+    return {'apikey': core.SUPABASE_KEY, 'Authorization': f'Bearer {core.SUPABASE_KEY}'}
+
+
+async def _select_custom_products(conditions):
+    """custom_products를 PostgREST or 필터로 조회 (실패 시 None, 설정이 없으면 SupabaseUnavailable)"""
+    # 설정이 없으면 호출하지 않음 (서킷 브레이커에 실패로 기록되지 않도록)
+    if not core.SUPABASE_URL or not core.SUPABASE_KEY:
+        raise core.SupabaseUnavailable('SUPABASE_URL / SUPABASE_KEY not set')
+
+    response = await upstream_request(
+        'supabase', 'GET', f'{core.SUPABASE_URL}/rest/v1/custom_products',
+        params={'select': core.CUSTOM_PRODUCT_COLUMNS, 'or': f'({conditions})'},
+        headers=_supabase_headers()
+    )
+
+    if response.status_code != 200:
+        try:
+            error = response.json()
+        except ValueError:
+            error = None
+
+        if isinstance(error, dict) and error.get('code') == core.UNDEFINED_COLUMN:
+            core.report_schema_error(error.get('message'))
+        else:
+            logger.error("[Supabase Error] status %s: %.300s", response.status_code, response.text)
+        _count_error()
+        return None
+
+    return response.json()
+
+
+@tracing.traced('supabase')
+@cached('supabase')
+async def search_custom_database(search_value):
+    """Supabase에서 검색 (barcode 또는 imrpt_no를 한 번의 쿼리로)"""
+    try:
+        quoted = core._postgrest_quote(search_value)
+        rows = await _select_custom_products(f'barcode.eq.{quoted},imrpt_no.eq.{quoted}')
+
+        product = core._match_custom_products(rows or [], [search_value])[search_value]
+
+        if product:
+            logger.info("[Supabase] ✓ Found: %s", product['product_name'])
+            return from_custom_product(product)
+        return None
+
+    except CircuitOpenError:
+        logger.warning("[Supabase] Circuit open, skipped")
+        return None
+    except core.SupabaseUnavailable as e:
+        logger.warning("[Supabase] Skipped: %s", e)
+        return None
+    except Exception as e:
+        logger.exception("[Supabase Error] %s", e)
+        return None
+
+
+async def search_custom_database_batch(search_values):
+    """여러 검색값을 Supabase 쿼리 한 번(최대 CUSTOM_DATABASE_BATCH_SIZE개씩)으로 조회하여 캐시에 채움"""
+    def uncached_values():
+        return [
+            value for value in dict.fromkeys(search_values)
+            if core.product_cache.get('supabase', value, record=False) is MISSING
+        ]
+
+    search_values = await cache_call(uncached_values)
+
+    for i in range(0, len(search_values), core.CUSTOM_DATABASE_BATCH_SIZE):
+        chunk = search_values[i:i + core.CUSTOM_DATABASE_BATCH_SIZE]
+        quoted = ','.join(core._postgrest_quote(value) for value in chunk)
+
+        try:
+            rows = await _select_custom_products(f'barcode.in.({quoted}),imrpt_no.in.({quoted})')
+        except core.SupabaseUnavailable as e:
+            logger.warning("[Supabase] Batch skipped: %s", e)
+            return
+        except Exception as e:
+            logger.warning("[Supabase Batch Error] %s", e)
+            continue
+
+        if rows is None:
+            continue
+
+        matches = core._match_custom_products(rows, chunk)
+        logger.info("[Supabase] Batch lookup: %d/%d found", sum(1 for row in matches.values() if row), len(chunk))
+
+        def fill_cache():
+            for search_value, product in matches.items():
+                if product:
+                    core.product_cache.set(
+                        'supabase', search_value, from_custom_product(product), core.CACHE_TTLS['supabase']
+                    )
+                else:
+                    core.product_cache.set('supabase', search_value, None, core.CACHE_NEGATIVE_TTL)
+
+        await cache_call(fill_cache)
+
+
+@tracing.traced('c005')
+@cached('c005')
+async def search_barcode_link_api(barcode):
+    """★ C005 바코드연계제품정보 API로 바코드 → 품목보고번호 매핑 ★"""
+    try:
+        if not core.FOOD_SAFETY_API_KEY:
+            logger.warning("[C005] API Key not set")
+            return None
+
+        logger.info("[C005] Searching barcode: %s", barcode)
+        response = await upstream_request('c005', 'GET', core.c005_url(barcode))
+
+        if response.status_code != 200:
+            logger.warning("[C005] Failed with status %s", response.status_code)
+            return None
+
+        result_code, result_msg, total_count, rows = c005_result(response.json())
+
+        if result_code == 'INFO-200':
+            logger.info("[C005] No data found for this barcode")
+            return None
+
+        if result_code and result_code != 'INFO-000':
+            logger.warning("[C005] API Error: %s - %s", result_code, result_msg)
+            return None
+
+        if rows:
+            mapping = c005_mapping(rows[0], barcode)
+            logger.info("[C005] ✓ Found mapping: %s → %s (%s)", barcode, mapping['product_report_no'], mapping['product_name'])
+            await asyncio.to_thread(core.barcode_mapping_store.put, mapping)
+            return mapping
+
+        logger.info("[C005] No data found in response")
+        return None
+
+    except httpx.TimeoutException:
+        logger.warning("[C005] Request timeout")
+        return None
+    except CircuitOpenError:
+        logger.warning("[C005] Circuit open, skipped")
+        return None
+    except Exception as e:
+        logger.exception("[C005] Error: %s", e)
+        return None
+
+
+@tracing.traced('haccp')
+@cached('haccp')
+async def search_haccp_api(search_value):
+    """HACCP API에서 검색 (오래되지 않은 로컬 사본 우선)"""
+    stale = None
+
+    try:
+        product, stale = await asyncio.to_thread(core.mirror_lookup, search_value)
+
+        if product:
+            return product
+
+        logger.info("[HACCP] Searching with product number: %s", search_value)
+        response = await upstream_request('haccp', 'GET', core.HACCP_API_URL, params=core.haccp_params(search_value))
+
+        if response.status_code != 200:
+            return core.stale_mirror_fallback(stale)
+
+        records = [from_haccp(item) for item in haccp_items(response.json())]
+
+        if records:
+            product = records[0]
+            logger.info("[HACCP] ✓ Found product: %s", product.name_or('Unknown'))
+            await asyncio.to_thread(core.haccp_mirror.upsert_many, records)
+            return product
+
+        return None
+
+    except Exception as e:
+        logger.warning("[HACCP] Error: %s", e)
+        return core.stale_mirror_fallback(stale)
+
+
+async def _foodqr_probe(search_value, search_info, deadline):
+    """FoodQR 검색 방식 하나 실행 → 제품 또는 None (업스트림 실패는 _lookup_errors에 기록됨)"""
+    search_name = search_info['name']
+
+    try:
+        logger.info("[FoodQR] Searching with %s: %s", search_name, search_value)
+
+        with tracing.span(f"foodqr_{search_info['key']}", search_value):
+            response = await upstream_request(
+                'foodqr', 'GET', core.FOOD_QR_API_URL, deadline=deadline, params=search_info['params']
+            )
+
+        if response.status_code != 200:
+            logger.warning("[FoodQR] Failed with %s", response.status_code)
+            return None
+
+        product = foodqr_item(response.json())
+        core.foodqr_probe_stats.record(search_info['key'], product is not None)
+        metrics.FOODQR_PROBES.labels(search_info['key'], 'hit' if product is not None else 'miss').inc()
+
+        if product is None:
+            logger.info("[FoodQR] No items found with %s", search_name)
+        return product
+
+    except Exception as e:
+        logger.warning("[FoodQR] Error with %s: %s", search_name, e)
+        return None
+
+
+async def _foodqr_probes_parallel(search_value, probes, deadline):
+    """
+    모든 검색 방식을 동시에 요청하고 우선순위 순서로 결과 확인
+
+    앞선 방식에서 찾으면 나머지 요청은 기다리지 않습니다. 마감 시각이 지나면 그때까지 끝난
+    뒷순위 방식의 결과를 사용합니다.
+    진행 중인 요청은 취소하지 않고 백그라운드에서 끝까지 실행합니다 (resolve_product와 같은 이유로,
+    서킷 브레이커 시험 호출이 중간에 끊기지 않도록 함).
+    """
+    tasks = [asyncio.ensure_future(_foodqr_probe(search_value, search_info, deadline)) for search_info in probes]
+
+    try:
+        for i, (search_info, task) in enumerate(zip(probes, tasks)):
+            done, _ = await asyncio.wait({task}, timeout=max(0, deadline - time.monotonic()))
+
+            if not done:
+                logger.warning("[FoodQR] Deadline exceeded waiting for %s", search_info['name'])
+                _count_error()
+
+                for later_info, later in zip(probes[i + 1:], tasks[i + 1:]):
+                    if later.done() and later.result() is not None:
+                        return core.foodqr_result(later_info, later.result())
+                return None
+
+            if task.result() is not None:
+                return core.foodqr_result(search_info, task.result())
+
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                _background_tasks.add(task)
+                task.add_done_callback(_discard_background_task)
+
+
+async def _foodqr_probes_sequential(search_value, probes, deadline):
+    for search_info in core.foodqr_probe_stats.ordered(probes):
+        if time.monotonic() >= deadline:
+            logger.warning("[FoodQR] Deadline exceeded before %s", search_info['name'])
+            _count_error()
+            return None
+
+        product = await _foodqr_probe(search_value, search_info, deadline)
+        if product is not None:
+            return core.foodqr_result(search_info, product)
+
+    return None
+
+
+@tracing.traced('foodqr')
+@cached('foodqr')
+async def search_foodqr_api(search_value):
+    """Food QR API에서 검색 (검색 방식이 여럿이면 동시에 요청)"""
+    probes = core.foodqr_probes(search_value)
+    deadline = core.upstream_deadline('foodqr')
+
+    if len(probes) > 1 and core.FOODQR_PARALLEL_PROBES:
+        result = await _foodqr_probes_parallel(search_value, probes, deadline)
+    else:
+        result = await _foodqr_probes_sequential(search_value, probes, deadline)
+
+    if result is not None:
+        logger.info("[FoodQR] ✓ Found using %s", result.search_method)
+        return result
+
+    logger.info("[FoodQR] ✗ All search methods failed")
+    return None
+
+
+async def stage_custom_database(search_value):
+    product = await search_custom_database(search_value)
+    return core.custom_database_payload(product) if product else None
+
+
+async def stage_haccp(search_value):
+    product = await search_haccp_api(search_value)
+    return core.haccp_payload(product) if product else None
+
+
+async def stage_foodqr(search_value):
+    product = await search_foodqr_api(search_value)
+    return core.foodqr_payload(product) if product else None
+
+
+async def stage_barcode_link(search_value):
+    barcode_mapping = await search_barcode_link_api(search_value)
+
+    if not barcode_mapping:
+        return None
+
+    return await resolve_barcode_mapping(search_value, barcode_mapping)
+
+
+async def stage_stored_mapping(search_value):
+    store = core.barcode_mapping_store
+    barcode_mapping = await asyncio.to_thread(store.get, search_value)
+
+    if not barcode_mapping:
+        return await stage_barcode_link(search_value)
+
+    if store.is_stale(barcode_mapping) and await asyncio.to_thread(store.claim_refresh, search_value):
+        logger.info("[Mapping] Stale mapping for %s, refreshing in background", search_value)
+        run_in_background(search_barcode_link_api.uncached(search_value))
+
+    return await resolve_barcode_mapping(search_value, barcode_mapping)
+
+
+async def resolve_barcode_mapping(search_value, barcode_mapping):
+    """바코드 매핑의 품목보고번호로 HACCP → FoodQR 재검색"""
+    product_report_no = barcode_mapping['product_report_no']
+    info = core.mapping_info(search_value, barcode_mapping)
+    logger.info("[Search] Step 5: Retrying with product report number: %s", product_report_no)
+
+    haccp_retry = await search_haccp_api(product_report_no)
+
+    if haccp_retry:
+        payload = core.mapped_haccp_payload(barcode_mapping, haccp_retry, info)
+        if payload:
+            return payload
+
+    foodqr_retry = await search_foodqr_api(product_report_no)
+
+    if foodqr_retry:
+        payload = core.mapped_foodqr_payload(foodqr_retry, info)
+        if payload:
+            return payload
+
+    return core.mapping_basic_payload(barcode_mapping)
+
+
+SEARCH_STAGES = {
+    'custom_database': stage_custom_database,
+    'haccp': stage_haccp,
+    'foodqr': stage_foodqr,
+    'barcode_link': stage_barcode_link,
+    'stored_mapping': stage_stored_mapping
+}
+
+
+async def resolve_product(search_value):
+    """
+    ★ 모든 검색 단계를 동시에 실행하고 우선순위 순서로 첫 결과 반환 ★
+
+    결과가 확정된 뒤에도 진행 중인 단계는 취소하지 않고 끝까지 실행하여 캐시를 채웁니다.
+    (스레드 모드와 같은 동작이며, 진행 중인 서킷 브레이커 시험 호출이 중간에 끊기지 않도록 함)
+    """
+    # 저장된 바코드 매핑 조회(SQLite)가 포함됨
+    names = await asyncio.to_thread(core.search_stage_names, search_value)
+    tasks = [asyncio.ensure_future(SEARCH_STAGES[name](search_value)) for name in names]
+
+    try:
+        for name, task in zip(names, tasks):
+            payload = await task
+
+            if payload:
+                logger.info("[Search] ✓ Resolved by stage_%s", name)
+                metrics.SEARCH_RESOLVED.labels(name).inc()
+                return payload
+
+        metrics.SEARCH_RESOLVED.labels('not_found').inc()
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                _background_tasks.add(task)
+                task.add_done_callback(_discard_background_task)
+
+
+search_flight = AsyncSingleFlight()
+
+
+async def search_result(search_value):
+    """검색값 하나를 처리하여 (응답 본문, HTTP 상태 코드) 반환"""
+    try:
+        with tracing.span('resolve') as span_result:
+            payload, shared = await search_flight.do(search_value, resolve_product, search_value)
+            span_result['outcome'] = 'shared' if shared else 'leader'
+
+        if shared:
+            logger.info("[Search] Joined in-flight lookup")
+            metrics.SEARCH_COALESCED.inc()
+
+        if payload:
+            return payload, 200
+
+        logger.info("[Search] All sources returned no results")
+        return {'error': 'Product not found in any database.'}, 404
+
+    except httpx.TimeoutException:
+        return {'error': 'API request timeout. Please try again.'}, 504
+    except Exception as e:
+        logger.exception("[Search Error] %s", e)
+        return {'error': 'Server error'}, 500
+
+
+async def search_product(data, query):
+    search_value = str(data.get('searchValue') or '').strip()
+
+    logger.info("Search request: %s", search_value)
+
+    if not search_value:
+        return {'error': 'Please enter a product number or barcode'}, 400
+
+    body, status = await search_result(search_value)
+
+    # ?debug=1 또는 {"debug": true}: 단계별 소요 시간을 응답에 포함
+    if query.get('debug') or data.get('debug'):
+        body = {**body, 'debug': {'spans': tracing.current_trace.get().to_list()}}
+
+    return body, status
+
+
+async def search_product_batch(data, query):
+    """여러 바코드/품목보고번호를 한 번에 검색 (응답 형식은 Flask /search/batch와 동일)"""
+    search_values = data.get('searchValues')
+
+    if not isinstance(search_values, list) or not search_values:
+        return {'error': 'searchValues must be a non-empty list'}, 400
+
+    if len(search_values) > core.BATCH_MAX_ITEMS:
+        return {'error': f'Too many items (max {core.BATCH_MAX_ITEMS})'}, 400
+
+    raw_values, search_values = search_values, core.batch_search_values(search_values)
+    unique_values = list(dict.fromkeys(value for value in search_values if value))
+
+    logger.info("[Batch] %d items, %d unique", len(search_values), len(unique_values))
+
+    await search_custom_database_batch(unique_values)
+
+    semaphore = asyncio.Semaphore(core.BATCH_MAX_CONCURRENCY)
+
+    async def limited(value):
+        async with semaphore:
+            return await search_result(value)
+
+    bodies = await asyncio.gather(*(limited(value) for value in unique_values))
+    results = dict(zip(unique_values, bodies))
+
+    items = []
+    for raw_value, search_value in zip(raw_values, search_values):
+        if not search_value:
+            body, status = core.batch_item_error(search_value)
+        else:
+            body, status = results[search_value]
+
+        items.append({'searchValue': raw_value if search_value is None else search_value, 'status': status, **body})
+
+    return {
+        'count': len(items),
+        'found': sum(1 for item in items if item['status'] == 200),
+        'results': items
+    }, 200
+
+
+# 비동기로 처리하는 경로 (POST만), 나머지는 Flask 앱으로 전달
+ASYNC_ROUTES = {
+    '/search': search_product,
+    '/search/batch': search_product_batch
+}
+
+
+async def _read_body(receive):
+    chunks = []
+
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _handle(scope, receive, send, endpoint, handler):
+    """요청 ID/추적/메트릭 처리 후 handler(data, query) 실행 (app.py의 before/after_request 훅과 동일)"""
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    request_id = headers.get('x-request-id') or uuid.uuid4().hex[:16]
+    request_id_token = request_id_var.set(request_id)
+    trace_token = tracing.start_trace()
+    started = time.monotonic()
+
+    try:
+        try:
+            data = json.loads(await _read_body(receive) or b'null')
+        except ValueError:
+            data = None
+
+        if isinstance(data, dict):
+            query = dict(urllib.parse.parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+            body, status = await handler(data, query)
+        else:
+            body, status = {'error': 'Request body must be a JSON object'}, 400
+
+        # jsonify와 같은 직렬화 설정 사용 (응답 형식 동일)
+        payload = core.app.json.response(body).get_data()
+        response_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+            (b'x-request-id', request_id.encode('latin-1'))
+        ]
+
+        trace = tracing.current_trace.get()
+        if trace.spans:
+            response_headers.append((b'server-timing', trace.server_timing().encode('latin-1')))
+
+        metrics.REQUEST_LATENCY.labels(endpoint).observe(time.monotonic() - started)
+        metrics.REQUESTS.labels(endpoint, 'POST', status).inc()
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': payload})
+    finally:
+        tracing.current_trace.reset(trace_token)
+        request_id_var.reset(request_id_token)
+
+
+async def _lifespan(receive, send):
+    global _http_client
+
+    while True:
+        message = await receive()
+
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+wsgi_app = WSGIMiddleware(core.app, workers=ASYNC_WSGI_THREADS)
+
+
+async def application(scope, receive, send):
+    """ASGI 진입점"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    handler = ASYNC_ROUTES.get(scope.get('path'))
+
+    if scope['type'] == 'http' and scope['method'] == 'POST' and handler is not None:
+        await _handle(scope, receive, send, scope['path'], handler)
+        return
+
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,150 @@
+"""
+스트리밍 JSON 파싱 동등성 확인 및 메모리 비교
+
+무작위로 만든 HACCP/FoodQR/C005 응답을 임의 위치(UTF-8 문자 중간 포함)에서 나눈 조각으로
+iter_*_stream에 넣어, 전체 응답을 json.loads한 뒤 파싱한 결과와 같은지 확인합니다.
+큰 목록 응답에 대해서는 두 방식의 최대 메모리 사용량과 처리 시간을 비교합니다.
+
+사용법:
+    python bench/check_json_stream.py
+    python bench/check_json_stream.py --fuzz 5000 --rows 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from food_apis import (  # noqa: E402
+    haccp_items, haccp_total_count, foodqr_items, c005_result,
+    iter_haccp_stream, iter_foodqr_stream, iter_c005_stream
+)
+
+
+def random_product(rng, i):
+    return {
+        'prdlstReportNo': str(19780614000000 + i),
+        'prdlstNm': rng.choice(['초코칩쿠키', '비엔나소시지', 'Milk "2%"', '김치\n볶음밥', '']),
+        'rawmtrl': ', '.join(rng.choice(['밀가루', '우유', '대두', 'É', '\U0001F95C 땅콩']) for _ in range(rng.randint(0, 8))),
+        'kcal': rng.choice([0, 12, 3.5, -1, 1e10, None, True])
+    }
+
+
+def random_items(rng):
+    """API마다 다른 items 형태 (목록, item 감싸기, dict 하나, 빈 값)"""
+    products = [random_product(rng, i) for i in range(rng.randint(0, 6))]
+    shape = rng.randrange(5)
+
+    if shape == 0:
+        return products
+    if shape == 1:
+        return [{'item': product} for product in products]
+    if shape == 2:
+        return {'item': products}
+    if shape == 3:
+        return {'item': products[0]} if products else ''
+    return products[0] if products else []
+
+
+def random_response(rng):
+    kind = rng.choice(['haccp', 'foodqr', 'c005'])
+    total = rng.randint(0, 100)
+
+    if kind == 'haccp':
+        body = {'totalCount': total, 'items': random_items(rng), 'pageNo': 1}
+        if rng.random() < 0.5:
+            body = dict(reversed(list(body.items())))
+        return kind, {'header': {'resultCode': 'OK', 'ignored': [1, {'a': 'b'}]}, 'body': body}
+
+    if kind == 'foodqr':
+        return kind, {'response': {'header': {'resultCode': '00'}, 'body': {'items': random_items(rng), 'totalCount': str(total)}}}
+
+    rows = [{'BAR_CD': str(8801111111119 + i), 'PRDLST_NM': rng.choice(['초코칩쿠키', '라면'])} for i in range(rng.randint(0, 5))]
+    c005 = {'total_count': str(total), 'row': rows, 'RESULT': {'CODE': 'INFO-000', 'MSG': '정상'}}
+    if rng.random() < 0.5:
+        c005 = dict(reversed(list(c005.items())))
+    return kind, {'C005': c005}
+
+
+def chunked(data, rng):
+    """임의 위치에서 나눈 bytes 조각"""
+    cuts = sorted(rng.sample(range(len(data) + 1), min(len(data) + 1, rng.randint(0, 12))))
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+
+def expected(kind, result):
+    if kind == 'haccp':
+        return haccp_items(result), haccp_total_count(result)
+    if kind == 'foodqr':
+        return foodqr_items(result), int(result['response']['body']['totalCount'])
+    _, _, total_count, rows = c005_result(result)
+    return [row for row in rows if row], total_count
+
+
+STREAMS = {'haccp': iter_haccp_stream, 'foodqr': iter_foodqr_stream, 'c005': iter_c005_stream}
+
+
+def check(count, rng):
+    mismatches = []
+
+    for _ in range(count):
+        kind, result = random_response(rng)
+        data = json.dumps(result, ensure_ascii=rng.random() < 0.3, indent=rng.choice([None, 1])).encode()
+
+        meta = {}
+        items = list(STREAMS[kind](chunked(data, rng), meta))
+
+        if (items, meta['total_count']) != expected(kind, result):
+            mismatches.append((kind, data))
+
+    return mismatches
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스트리밍 JSON 파싱 동등성 확인 및 메모리 비교')
+    parser.add_argument('--fuzz', type=int, default=2000, help='무작위 응답 개수')
+    parser.add_argument('--rows', type=int, default=20000, help='큰 목록 응답의 제품 수')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mismatches = check(args.fuzz, rng)
+
+    for kind, data in mismatches[:5]:
+        print(f"MISMATCH {kind}: {data[:300]!r}")
+    print(f"{args.fuzz} fuzz responses: {len(mismatches)} mismatches")
+
+    # 큰 HACCP 목록 응답 (응답 본문을 조각으로 받는 상황)
+    data = json.dumps({
+        'header': {'resultCode': 'OK'},
+        'body': {'items': [{'item': random_product(rng, i)} for i in range(args.rows)], 'totalCount': args.rows}
+    }, ensure_ascii=False).encode()
+    chunks = [data[i:i + 65536] for i in range(0, len(data), 65536)]
+
+    # 전체 파싱: 본문을 이어 붙이고 json.loads 후 목록 생성 / 스트리밍: 제품을 하나씩 처리
+    full = measure(lambda: len(haccp_items(json.loads(b''.join(chunks)))))
+    stream = measure(lambda: sum(1 for _ in iter_haccp_stream(iter(chunks))))
+
+    print(f"{len(data) / 1e6:.1f} MB, {args.rows} products (body chunks not counted)")
+    for label, (count, elapsed, peak) in (('json.loads', full), ('stream', stream)):
+        print(f"{label:<11} {count} products  {elapsed * 1000:8.1f} ms  peak {peak / 1e6:7.1f} MB")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+로그 설정 확인
+
+JSON 형식에서 logger.exception의 예외가 msg가 아니라 exc 필드로 기록되는지,
+텍스트 형식에서도 예외 추적 내용이 출력되는지 확인합니다.
+
+사용법:
+    python bench/check_logging.py
+"""
+import io
+import json
+import logging
+import os
+import sys
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_config import configure_logging, stop_logging  # noqa: E402
+
+
+def capture(log_format):
+    """예외 로그 한 건을 기록하고 출력된 줄 반환"""
+    output = io.StringIO()
+
+    with redirect_stdout(output):
+        configure_logging('INFO', log_format)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.getLogger('check').exception("[Check] failed for %s", 'value')
+        stop_logging()
+
+    return output.getvalue()
+
+
+def main():
+    failures = []
+
+    entry = json.loads(capture('json').strip().splitlines()[-1])
+    if entry.get('msg') != '[Check] failed for value':
+        failures.append(f"json msg: {entry.get('msg')!r}")
+    if 'ZeroDivisionError' not in entry.get('exc', ''):
+        failures.append(f"json exc: {entry.get('exc')!r}")
+
+    text = capture('text')
+    if '[Check] failed for value' not in text or 'ZeroDivisionError' not in text:
+        failures.append(f"text: {text!r}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"logging: {len(failures)} failures")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+제품 레코드 캐시 메모리 비교
+
+같은 제품을 이전 형식(업스트림 항목 dict 전체를 담은 검색 결과 dict)과 ProductRecord로
+LRU 캐시에 채웠을 때의 메모리 사용량, 공유 캐시(SQLite)에 저장되는 값 크기를 비교합니다.
+레코드가 직렬화 후에도 같은 값으로 복원되는지도 확인합니다.
+
+사용법:
+    python bench/check_product_record.py
+    python bench/check_product_record.py --count 200000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import product_record  # noqa: E402
+from product_cache import LRUCache  # noqa: E402
+from product_record import from_custom_product, from_foodqr, from_haccp  # noqa: E402
+
+
+INGREDIENTS = ['밀가루(밀:미국산)', '설탕', '정제소금', '대두레시틴', '전지분유', '난백분', '팜유(말레이시아산)', '합성향료']
+
+
+def raw_materials(rng):
+    return ','.join(rng.choice(INGREDIENTS) for _ in range(rng.randint(5, 25)))
+
+
+def haccp_item(rng, i):
+    """HACCP API 제품 항목 (실제 응답과 같은 필드 구성)"""
+    return {
+        'rnum': str(i + 1),
+        'prdlstReportNo': str(19780614000000 + i),
+        'prdlstNm': f'초코칩쿠키 {i}',
+        'rawmtrl': raw_materials(rng),
+        'allergy': '밀, 대두, 우유, 계란 함유',
+        'nutrient': '열량 250kcal, 탄수화물 30g, 당류 12g, 단백질 3g, 지방 13g, 나트륨 180mg',
+        'prdkind': '과자',
+        'prdkindstate': '과자류',
+        'manufacture': '(주)스캔잇식품 제1공장',
+        'seller': '(주)스캔잇',
+        'capacity': '120g',
+        'barcode': str(8801111111119 + i),
+        'productGb': '식품',
+        'imgurl1': f'http://fresh.haccp.or.kr/prdimg/1978/{19780614000000 + i}/{19780614000000 + i}-1.jpg',
+        'imgurl2': f'http://fresh.haccp.or.kr/prdimg/1978/{19780614000000 + i}/{19780614000000 + i}-2.jpg'
+    }
+
+
+def foodqr_item(rng, i):
+    return {
+        'prdctNm': f'양념오징어채 {i}',
+        'imrptNo': str(20150715000000 + i),
+        'brcdNo': str(8801555555555 + i),
+        'prvwCn': f'<div class="label"><h3>원재료명 및 함량</h3><p>{raw_materials(rng)}</p>'
+                  '<table><tr><td>내용량</td><td>200g</td></tr></table></div>'
+    }
+
+
+def custom_row(rng, i):
+    return {
+        'id': i,
+        'barcode': str(8809999999997 + i),
+        'imrpt_no': None,
+        'product_name': f'직접 추가한 제품 {i}',
+        'raw_materials': raw_materials(rng),
+        'found_ingredients': {'밀': ['밀가루'], '대두': ['대두레시틴']},
+        'matcher_version': 'v1'
+    }
+
+
+def legacy_result(kind, item):
+    """이전 검색 결과 형식"""
+    if kind == 'haccp':
+        return {'source': 'HACCP', 'product': item}
+    if kind == 'foodqr':
+        return {'source': 'FoodQR', 'searchMethod': 'product report number (imrptNo)', 'product': item}
+    return {
+        'source': 'Custom Database',
+        'product': {
+            'id': item['id'], 'prdctNm': item['product_name'], 'prvwCn': item['raw_materials'],
+            'foundIngredients': item['found_ingredients'], 'matcherVersion': item['matcher_version']
+        }
+    }
+
+
+def record(kind, item):
+    if kind == 'haccp':
+        return from_haccp(item)
+    if kind == 'foodqr':
+        return from_foodqr(item, 'product report number (imrptNo)')
+    return from_custom_product(item)
+
+
+ITEMS = {'haccp': haccp_item, 'foodqr': foodqr_item, 'custom': custom_row}
+
+
+def fill(count, seed, convert):
+    """캐시에 count개를 채운 뒤 추적된 메모리 (업스트림 응답을 파싱한 항목은 변환 후 버림)"""
+    rng = random.Random(seed)
+    cache = LRUCache(maxsize=count)
+
+    tracemalloc.start()
+    for i in range(count):
+        kind = ('haccp', 'foodqr', 'custom')[i % 3]
+        cache.set(f'{kind}:{i}', convert(kind, ITEMS[kind](rng, i)), float('inf'))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return cache, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description='제품 레코드 캐시 메모리 비교')
+    parser.add_argument('--count', type=int, default=30000, help='캐시에 채울 제품 수')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    legacy_cache, legacy_bytes = fill(args.count, args.seed, legacy_result)
+    record_cache, record_bytes = fill(args.count, args.seed, record)
+
+    legacy_values = [value for value, _ in legacy_cache._data.values()]
+    record_values = [value for value, _ in record_cache._data.values()]
+    legacy_json = sum(len(json.dumps(value, ensure_ascii=False).encode()) for value in legacy_values)
+    record_json = sum(len(product_record.dumps(value).encode()) for value in record_values)
+
+    mismatches = sum(1 for value in record_values if product_record.loads(product_record.dumps(value)) != value)
+
+    print(f"{args.count} cached products (HACCP/FoodQR/Custom Database 1:1:1)")
+    print(f"{'':<14}{'in-process':>14}{'per product':>14}{'shared cache':>16}")
+    for label, memory, stored in (('upstream dict', legacy_bytes, legacy_json), ('ProductRecord', record_bytes, record_json)):
+        print(f"{label:<14}{memory / 1e6:>11.1f} MB{memory / args.count:>12.0f} B{stored / 1e6:>13.1f} MB")
+    print(f"round-trip mismatches: {mismatches}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
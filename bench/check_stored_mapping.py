@@ -0,0 +1,87 @@
+"""
+저장된 바코드 매핑 재검색 확인
+
+같은 바코드를 두 번 검색하여, 첫 검색 때 C005 매핑이 저장된 뒤에도 두 번째 검색이
+같은 결과(출처, 원재료)를 반환하는지 확인합니다. 8801888888887은 FoodQR에서 바코드로만 찾을 수 있고,
+C005 매핑의 품목보고번호는 HACCP/FoodQR 어디에도 없는 제품입니다.
+
+사용법:
+    python bench/check_stored_mapping.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import serve, stub_environment  # noqa: E402
+
+
+BARCODES = ['8801888888887', '8801111111119', '8801666666669']
+
+
+def wait_for_mapping(core, barcode, timeout=5.0):
+    """첫 검색에서 백그라운드로 실행된 C005 단계가 매핑을 저장할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if core.barcode_mapping_store.get(barcode):
+            return True
+        time.sleep(0.05)
+
+    return False
+
+
+def summary(payload):
+    return payload.get('source'), payload.get('rawMaterials')
+
+
+def check(label, core, search):
+    failures = 0
+
+    for barcode in BARCODES:
+        first = search(barcode)
+        stored = wait_for_mapping(core, barcode)
+        core.product_cache.local.clear()
+        second = search(barcode)
+
+        ok = stored and summary(first) == summary(second)
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label} {barcode}: {first.get('source')} → {second.get('source')}"
+              f"{'' if stored else ' (mapping not stored)'}")
+
+    return failures
+
+
+def main():
+    port = 8990
+    threading.Thread(target=serve, args=(port, {'foodqr': 0, 'haccp': 0, 'c005': 0, 'supabase': 0}), daemon=True).start()
+    time.sleep(0.3)
+
+    os.environ.update(stub_environment(port))
+    os.environ['LOCAL_STORE_DB'] = os.path.join(tempfile.mkdtemp(), 'local_store.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    import app as core
+    import asgi
+
+    client = core.app.test_client()
+    failures = check('wsgi', core, lambda barcode: client.post('/search', json={'searchValue': barcode}).get_json())
+
+    # 비동기 모드도 같은 저장소를 쓰므로 매핑과 캐시를 비우고 다시 확인
+    with core.barcode_mapping_store._connect() as conn:
+        conn.execute('DELETE FROM barcode_mapping')
+    core.product_cache.local.clear()
+
+    loop = asyncio.new_event_loop()
+    failures += check('asgi', core, lambda barcode: loop.run_until_complete(asgi.search_result(barcode))[0])
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
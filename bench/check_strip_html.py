@@ -0,0 +1,104 @@
+"""
+strip_html 동등성 확인 및 속도 비교
+
+bench/fixtures/elabels.json의 전자라벨 HTML(labels)과 경계 사례(edge_cases), 무작위로 조합한 HTML에 대해
+html_text.strip_html / iter_strip_html 결과가 기존 HTMLParser 구현(strip_html_reference)과
+같은지 확인하고, 두 구현의 처리 시간을 비교합니다.
+
+사용법:
+    python bench/check_strip_html.py
+    python bench/check_strip_html.py --fuzz 20000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from html_text import iter_strip_html, strip_html, strip_html_reference  # noqa: E402
+from stub_servers import load_fixture  # noqa: E402
+
+
+# 무작위 HTML을 만들 조각 (전자라벨에서 보이는 형태 + 경계 사례)
+FRAGMENTS = [
+    '밀가루', '우유', '대두', ', ', ' ', '  ', '\n', '\r\n', '\t', '\xa0', '(', ')', '%', '10',
+    '<p>', '</p>', '<br>', '<br/>', '<br />', '<span style="color:red">', '</span>',
+    '<td class=\'x\'>', '</td>', '<o:p>', '</o:p>', '<P ALIGN=CENTER>', '<a href=foo/>',
+    '<span title="a > b">', '<!-- 주석 -->', '<!-- a -- b -- >', '<!--', '-->',
+    '&nbsp;', '&amp;', '&lt;', '&gt;', '&#40;', '&#x2C;', '&amp', '&', ';', '&nbsp',
+    '<', '>', '< ', '</', '</ p>', '<!DOCTYPE html>', '<?xml ?>', '<![CDATA[x]]>',
+    '<script>', '</script>', '<style>', '</style>', '"', "'", '=',
+]
+
+
+def random_html(rng):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+
+
+def chunked(text, rng):
+    """임의 위치에서 나눈 조각 목록"""
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 6))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def check(samples, rng):
+    mismatches = []
+
+    for html_text in samples:
+        expected = strip_html_reference(html_text)
+
+        if strip_html(html_text) != expected:
+            mismatches.append(('strip_html', html_text))
+
+        if ''.join(iter_strip_html(chunked(html_text, rng))) != expected:
+            mismatches.append(('iter_strip_html', html_text))
+
+    return mismatches
+
+
+def timeit(func, samples, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html_text in samples:
+            func(html_text)
+    return (time.perf_counter() - started) / (repeat * len(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='strip_html 동등성 확인 및 속도 비교')
+    parser.add_argument('--fuzz', type=int, default=5000, help='무작위 HTML 개수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = load_fixture('elabels')
+    corpus = fixtures['labels'] + fixtures['edge_cases']
+    fuzz = [random_html(rng) for _ in range(args.fuzz)]
+
+    mismatches = check(corpus + fuzz, rng)
+
+    for name, html_text in mismatches[:10]:
+        print(f"MISMATCH {name}: {html_text!r}")
+        print(f"  reference: {strip_html_reference(html_text)!r}")
+        print(f"  fast:      {strip_html(html_text)!r}")
+
+    print(f"{len(corpus)} fixtures + {len(fuzz)} fuzz samples: {len(mismatches)} mismatches")
+
+    # 실제 전자라벨 형태와 큰 전자라벨 (수십 KB)
+    labels = fixtures['labels']
+    large = [''.join(labels) * 20]
+    for label, samples in (('labels', labels), ('large', large)):
+        repeat = args.repeat if label == 'labels' else max(1, args.repeat // 20)
+        reference = timeit(strip_html_reference, samples, repeat)
+        fast = timeit(strip_html, samples, repeat)
+        print(f"{label:<9} reference {reference:9.1f} us   fast {fast:9.1f} us   x{reference / fast:.1f}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+오프라인 벤치마크 (네트워크/API 키 불필요)
+
+기록된 응답을 돌려주는 스텁 서버(bench/stub_servers.py)를 띄우고, 앱을 로컬 HTTP 서버로 실행한 뒤
+/search, /add-product, 원재료 검출기를 지정한 동시성으로 호출하여
+처리량, p50/p95/p99 지연 시간, 메모리 사용량을 보고합니다.
+
+사용법:
+    python bench/run_bench.py                                  # 전체 시나리오
+    python bench/run_bench.py --scenario search --concurrency 32 --requests 2000
+    python bench/run_bench.py --latency haccp=0.5,foodqr=1.0   # 느린 업스트림 흉내
+    python bench/run_bench.py --server asgi                    # 비동기 모드(asgi.py, uvicorn)
+    python bench/run_bench.py --json > bench_output.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from html_text import strip_html  # noqa: E402
+from stub_servers import load_fixture, parse_latency, serve, stub_environment  # noqa: E402
+
+
+SCENARIOS = ('search', 'add-product', 'matcher')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'Port {port} did not open')
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, statuses, elapsed, extra=None):
+    latencies = sorted(latencies)
+    summary = {
+        'scenario': name,
+        'requests': len(latencies),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+        # Linux에서 ru_maxrss 단위는 KB
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+    summary.update(extra or {})
+    return summary
+
+
+def drive(base_url, make_request, total, concurrency):
+    """total번 요청을 concurrency개 스레드로 보내고 (지연 시간, 상태 코드, 소요 시간) 반환"""
+    local = threading.local()
+    latencies = []
+    statuses = []
+    lock = threading.Lock()
+
+    def worker(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        started = time.perf_counter()
+        method, path, body = make_request(i)
+        response = session.request(method, base_url + path, json=body, timeout=120)
+        latency = time.perf_counter() - started
+
+        with lock:
+            latencies.append(latency)
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(total)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def bench_search(base_url, args):
+    workload = load_fixture('workload')['items']
+    values = [value for value, _ in workload]
+    weights = [weight for _, weight in workload]
+    rng = random.Random(args.seed)
+    picks = rng.choices(values, weights=weights, k=args.requests)
+
+    return drive(base_url, lambda i: ('POST', '/search', {'searchValue': picks[i]}), args.requests, args.concurrency)
+
+
+def bench_add_product(base_url, args):
+    def make_request(i):
+        return 'POST', '/add-product', {
+            'productName': f'벤치마크 제품 {i}',
+            'barcode': f'880{9000000000 + i}',
+            'rawMaterials': '밀가루, 설탕, 대두유, 우유, 계란, 정제소금'
+        }
+
+    return drive(base_url, make_request, args.requests, args.concurrency)
+
+
+def bench_matcher(app_module, args):
+    """원재료 검출기 단독 측정 (네트워크 없음)"""
+    texts = [
+        item['item'].get('rawmtrl', '')
+        for response in load_fixture('haccp').values()
+        for item in response['body']['items']
+    ]
+    texts += [row['raw_materials'] for row in load_fixture('supabase')]
+    texts += [
+        strip_html(response['response']['body']['items']['item']['prvwCn'])
+        for response in load_fixture('foodqr')['imrptNo'].values()
+    ]
+    # 긴 원재료명(수 KB)도 포함
+    texts.append(','.join(texts) * 4)
+
+    iterations = args.requests * 10
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(i):
+        text = texts[i % len(texts)]
+        started = time.perf_counter()
+        app_module.find_ingredients(text)
+        latency = time.perf_counter() - started
+        with lock:
+            latencies.append(latency)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(iterations)))
+    return latencies, [200] * len(latencies), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ScanEat 오프라인 벤치마크')
+    parser.add_argument('--scenario', choices=SCENARIOS + ('all',), default='all')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency', help="스텁 서버 출처별 지연 시간 (예: 'haccp=0.15,foodqr=0.4')")
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi', help='Flask(스레드) 또는 asgi.py(uvicorn)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stub = multiprocessing.Process(target=serve, args=(stub_port, parse_latency(args.latency)), daemon=True)
+    stub.start()
+    wait_for_port(stub_port)
+
+    # 앱은 스텁 서버와 빈 로컬 저장소를 사용하도록 설정한 뒤 import
+    workdir = tempfile.mkdtemp(prefix='scaneat-bench-')
+    os.environ.update(stub_environment(stub_port))
+    os.environ['LOCAL_STORE_DB'] = os.path.join(workdir, 'local_store.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    import app as app_module
+
+    app_port = free_port()
+    base_url = f'http://127.0.0.1:{app_port}'
+
+    if args.server == 'asgi':
+        import uvicorn
+        import asgi
+
+        server = uvicorn.Server(uvicorn.Config(asgi.application, port=app_port, log_level='warning', access_log=False))
+        server.shutdown = lambda: setattr(server, 'should_exit', True)
+        threading.Thread(target=server.run, daemon=True).start()
+    else:
+        from werkzeug.serving import make_server
+
+        # werkzeug는 자체적으로 INFO 레벨을 설정하므로 요청 로그를 따로 끔
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+        server = make_server('127.0.0.1', app_port, app_module.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    wait_for_port(app_port)
+
+    scenarios = SCENARIOS if args.scenario == 'all' else (args.scenario,)
+    results = []
+
+    for name in scenarios:
+        if name == 'matcher':
+            latencies, statuses, elapsed = bench_matcher(app_module, args)
+            results.append(summarize(name, latencies, statuses, elapsed))
+            continue
+
+        calls_before = requests.get(f'http://127.0.0.1:{stub_port}/_calls').json()
+        runner = bench_search if name == 'search' else bench_add_product
+        latencies, statuses, elapsed = runner(base_url, args)
+        calls_after = requests.get(f'http://127.0.0.1:{stub_port}/_calls').json()
+
+        upstream_calls = {source: calls_after[source] - calls_before.get(source, 0) for source in calls_after}
+        results.append(summarize(name, latencies, statuses, elapsed, {'upstream_calls': upstream_calls}))
+
+    server.shutdown()
+    stub.terminate()
+
+    if args.json:
+        print(json.dumps({'server': args.server, 'concurrency': args.concurrency, 'results': results}, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\nserver={args.server} concurrency={args.concurrency} requests={args.requests}")
+    print(f"{'scenario':<12} {'reqs':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rss MB':>7}  statuses / upstream calls")
+    for result in results:
+        print(
+            f"{result['scenario']:<12} {result['requests']:>6} {result['throughput_rps']:>9} "
+            f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} {result['max_ms']:>9} "
+            f"{result['max_rss_mb']:>7}  {result['statuses']} {result.get('upstream_calls', '')}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+벤치마크용 업스트림 스텁 서버 (HACCP, FoodQR, C005, Supabase REST)
+
+bench/fixtures의 기록된 응답을 그대로 돌려주며, 출처별로 지연 시간을 흉내 냅니다.
+하나의 포트에서 경로로 구분합니다.
+
+    /haccp                          → HACCP_API_URL
+    /foodqr                         → FOOD_QR_API_URL
+    /c005/{key}/C005/json/{s}/{e}/… → BARCODE_LINK_API_URL=/c005
+    /rest/v1/custom_products        → SUPABASE_URL (GET 조회, POST 추가, PATCH id=eq.N 갱신)
+
+단독 실행:
+    python bench/stub_servers.py --port 8900 --latency haccp=0.15,foodqr=0.4
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 운영 환경에서 관측되는 대략적인 응답 시간 (초)
+DEFAULT_LATENCY = {
+    'haccp': 0.15,
+    'foodqr': 0.4,
+    'c005': 0.3,
+    'supabase': 0.05
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, f'{name}.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_latency(value):
+    """'haccp=0.1,foodqr=0.2' 형식 파싱"""
+    latency = dict(DEFAULT_LATENCY)
+
+    for item in (value or '').split(','):
+        source, _, seconds = item.strip().partition('=')
+
+        if source and seconds:
+            latency[source] = float(seconds)
+
+    return latency
+
+
+class StubState:
+    """스텁 서버가 공유하는 기록 응답과 지연 설정"""
+    def __init__(self, latency):
+        self.latency = latency
+        self.haccp = load_fixture('haccp')
+        self.foodqr = load_fixture('foodqr')
+        self.c005 = load_fixture('c005')
+        self.supabase_rows = load_fixture('supabase')
+        self.lock = threading.Lock()
+        self.calls = {source: 0 for source in DEFAULT_LATENCY}
+
+
+    def haccp_response(self, params):
+        report_no = params.get('prdlstReportNo')
+
+        if report_no:
+            return self.haccp.get(report_no) or {
+                'header': {'resultCode': 'OK'}, 'body': {'items': [], 'totalCount': 0}
+            }
+
+        # 동기화 작업용 전체 목록 페이지
+        items = [item for response in self.haccp.values() for item in response['body']['items']]
+        page_no = int(params.get('pageNo', 1))
+        num_of_rows = int(params.get('numOfRows', 10))
+        page = items[(page_no - 1) * num_of_rows:page_no * num_of_rows]
+        return {'header': {'resultCode': 'OK'}, 'body': {'items': page, 'totalCount': len(items)}}
+
+
+    def foodqr_response(self, params):
+        for key in ('imrptNo', 'brcdNo'):
+            if params.get(key) in self.foodqr.get(key, {}):
+                return self.foodqr[key][params[key]]
+
+        return {'response': {'header': {'resultCode': '00'}, 'body': {'items': '', 'totalCount': 0}}}
+
+
+    def c005_response(self, path):
+        match = re.search(r'/C005/json/\d+/\d+/BAR_CD=(\w+)', path)
+
+        if match and match.group(1) in self.c005:
+            return self.c005[match.group(1)]
+
+        return {'C005': {'total_count': '0', 'RESULT': {'CODE': 'INFO-200', 'MSG': '해당하는 데이터가 없습니다.'}}}
+
+
+    def supabase_select(self, params):
+        # or=(barcode.eq."X",imrpt_no.eq."X") / in.("X","Y") 형식에서 값만 추출
+        values = set(re.findall(r'"((?:[^"\\]|\\.)*)"', params.get('or', '')))
+        columns = [column for column in params.get('select', '*').split(',') if column != '*']
+
+        rows = [
+            row for row in self.supabase_rows
+            if 'or' not in params or row.get('barcode') in values or row.get('imrpt_no') in values
+        ]
+
+        # 색인 생성/재분석용 id 순 페이지 조회 (id=gt.N&order=id&limit=M)
+        if params.get('id', '').startswith('gt.'):
+            rows = [row for row in rows if row.get('id', 0) > int(params['id'][3:])]
+        if 'limit' in params:
+            rows = sorted(rows, key=lambda row: row.get('id', 0))[:int(params['limit'])]
+
+        if columns:
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+
+        return rows
+
+
+    def supabase_insert(self, body):
+        rows = body if isinstance(body, list) else [body]
+
+        with self.lock:
+            for row in rows:
+                row['id'] = len(self.supabase_rows) + 1
+                self.supabase_rows.append(row)
+
+        return rows
+
+
+    def supabase_update(self, params, body):
+        # id=eq.N 형식만 지원
+        row_id = int(params.get('id', 'eq.0').partition('.')[2])
+
+        with self.lock:
+            rows = [row for row in self.supabase_rows if row.get('id') == row_id]
+            for row in rows:
+                row.update(body)
+
+        return rows
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        # keep-alive 연결 재사용이 가능하도록 HTTP/1.1 사용
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+        def _delay(self, source):
+            with state.lock:
+                state.calls[source] += 1
+            time.sleep(state.latency.get(source, 0))
+
+
+        def do_GET(self):
+            # postgrest-py는 GET에도 본문('{}')을 보내므로 keep-alive 연결이 꼬이지 않도록 읽어서 버림
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            parsed = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(parsed.query))
+
+            if parsed.path.startswith('/haccp'):
+                self._delay('haccp')
+                self._send(200, state.haccp_response(params))
+            elif parsed.path.startswith('/foodqr'):
+                self._delay('foodqr')
+                self._send(200, state.foodqr_response(params))
+            elif parsed.path.startswith('/c005'):
+                self._delay('c005')
+                self._send(200, state.c005_response(urllib.parse.unquote(parsed.path)))
+            elif parsed.path.startswith('/rest/v1/custom_products'):
+                self._delay('supabase')
+                self._send(200, state.supabase_select(params))
+            elif parsed.path == '/_calls':
+                self._send(200, state.calls)
+            else:
+                self._send(404, {'error': 'not found'})
+
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+
+            if self.path.startswith('/rest/v1/custom_products'):
+                self._delay('supabase')
+                self._send(201, state.supabase_insert(body))
+            else:
+                self._send(404, {'error': 'not found'})
+
+
+        def do_PATCH(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            parsed = urllib.parse.urlsplit(self.path)
+
+            if parsed.path.startswith('/rest/v1/custom_products'):
+                self._delay('supabase')
+                self._send(200, state.supabase_update(dict(urllib.parse.parse_qsl(parsed.query)), body))
+            else:
+                self._send(404, {'error': 'not found'})
+
+    return StubHandler
+
+
+def serve(port, latency):
+    """스텁 서버 실행 (블로킹)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(StubState(latency)))
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def stub_environment(port):
+    """앱이 스텁 서버를 사용하도록 하는 환경 변수"""
+    base = f'http://127.0.0.1:{port}'
+    return {
+        'HACCP_API_URL': f'{base}/haccp',
+        'FOOD_QR_API_URL': f'{base}/foodqr',
+        'BARCODE_LINK_API_URL': f'{base}/c005',
+        'SUPABASE_URL': base,
+        # supabase-py는 JWT 형식의 키만 허용
+        'SUPABASE_KEY': 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark',
+        'SERVICE_KEY': 'benchmark',
+        'FOODQR_ACCESS_KEY': 'benchmark',
+        'FOOD_SAFETY_API_KEY': 'benchmark'
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='벤치마크용 업스트림 스텁 서버')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', help="출처별 지연 시간 (예: 'haccp=0.15,foodqr=0.4')")
+    args = parser.parse_args()
+
+    print(f"Stub servers on http://127.0.0.1:{args.port}")
+    for key, value in stub_environment(args.port).items():
+        print(f"  {key}={value}")
+
+    serve(args.port, parse_latency(args.latency))
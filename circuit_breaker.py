@@ -0,0 +1,168 @@
+"""공공 API/Supabase 호출용 서킷 브레이커와 적응형 타임아웃"""
+import logging
+import threading
+import time
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+_thread_state = threading.local()
+
+
+def thread_error_count():
+    """
+    현재 스레드에서 지금까지 실패한 업스트림 호출 수
+
+    캐시가 '검색 결과 없음'과 '장애로 인한 실패'를 구분하는 데 사용합니다.
+    호출 전후 값이 다르면 그 사이에 실패가 있었던 것입니다.
+    """
+    return getattr(_thread_state, 'errors', 0)
+
+
+def count_thread_error():
+    """현재 스레드의 실패 수 증가 (다른 스레드에서 실패한 호출을 요청한 스레드에 반영할 때도 사용)"""
+    _thread_state.errors = thread_error_count() + 1
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출을 건너뜀"""
+
+
+class CircuitBreaker:
+    """
+    ★ 업스트림별 서킷 브레이커 ★
+
+    최근 호출의 지연 시간과 실패율을 추적하여
+    - 실패율이 기준을 넘으면 서킷을 열어 open_seconds 동안 호출을 건너뛰고
+    - 그 뒤 한 번의 시험 호출(half-open)이 성공하면 다시 닫으며
+    - 읽기 타임아웃을 최근 지연 시간 백분위수에서 계산합니다.
+    """
+    def __init__(self, name, window=50, min_calls=10, failure_rate=0.5, open_seconds=30,
+                 min_timeout=2.0, max_timeout=15.0, timeout_percentile=0.95, timeout_factor=2.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_percentile = timeout_percentile
+        self.timeout_factor = timeout_factor
+
+        self._calls = deque(maxlen=window)  # (지연 시간, 성공 여부)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+
+    def allow(self):
+        """호출 가능 여부 (half-open 상태에서는 한 번의 시험 호출만 허용)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN and time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+
+            if self._probing:
+                return False
+
+            self._state = HALF_OPEN
+            self._probing = True
+            return True
+
+
+    def record(self, latency, ok):
+        with self._lock:
+            self._calls.append((latency, ok))
+
+            if self._state == HALF_OPEN:
+                self._probing = False
+
+                if ok:
+                    logger.info("[Circuit] %s closed", self.name)
+                    self._state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, call_ok in self._calls if not call_ok)
+
+                if failures / len(self._calls) >= self.failure_rate:
+                    self._open()
+
+
+    def _open(self):
+        logger.warning("[Circuit] %s opened for %ss", self.name, self.open_seconds)
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+
+    def read_timeout(self):
+        """최근 성공한 호출 지연 시간 백분위수 × 배수 (min_timeout ~ max_timeout)"""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._calls if ok)
+
+        if len(latencies) < self.min_calls:
+            return self.max_timeout
+
+        index = min(len(latencies) - 1, int(len(latencies) * self.timeout_percentile))
+        return max(self.min_timeout, min(self.max_timeout, latencies[index] * self.timeout_factor))
+
+
+    def call(self, func, *args, **kwargs):
+        """
+        서킷을 거쳐 호출
+
+        서킷이 열려 있으면 CircuitOpenError, 예외나 5xx 응답은 실패로 기록합니다.
+        """
+        if not self.allow():
+            count_thread_error()
+            raise CircuitOpenError(f'{self.name} circuit is open')
+
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(time.monotonic() - started, False)
+            count_thread_error()
+            raise
+
+        ok = getattr(result, 'status_code', 200) < 500
+        self.record(time.monotonic() - started, ok)
+
+        if not ok:
+            count_thread_error()
+
+        return result
+
+
+    def snapshot(self):
+        """상태 확인용 요약"""
+        with self._lock:
+            calls = list(self._calls)
+
+        failures = sum(1 for _, ok in calls if not ok)
+        return {
+            'state': self.state,
+            'calls': len(calls),
+            'failureRate': round(failures / len(calls), 3) if calls else 0.0,
+            'readTimeout': round(self.read_timeout(), 2)
+        }
@@ -0,0 +1,188 @@
+"""공공 API 응답 파싱 (app.py 검색과 로컬 동기화 작업에서 공용)"""
+from json_stream import iter_json_paths
+
+
+def _flatten_items(items):
+    """
+    items 값을 제품 목록으로 펼침 (전체 응답 파싱과 스트리밍 파싱에서 공용)
+
+    목록, {"item": {...}} / {"item": [...]}로 감싼 항목, 제품 dict 하나를 모두 처리하고 빈 값은 건너뜁니다.
+    """
+    if isinstance(items, list):
+        for item in items:
+            yield from _flatten_items(item)
+    elif isinstance(items, dict):
+        if 'item' in items:
+            yield from _flatten_items(items['item'])
+        elif items:
+            yield items
+
+
+def haccp_items(result):
+    """
+    HACCP API 응답에서 제품 목록 추출
+
+    응답 구조: {"header": {...}, "body": {"items": [{"item": {...}}, ...], "totalCount": N}}
+    items가 dict 하나로 오거나, 각 항목이 {"item": {...}}로 감싸져 오는 경우를 모두 처리합니다.
+    """
+    body = result.get('body') or {}
+    return list(_flatten_items(body.get('items')))
+
+
+def haccp_total_count(result):
+    """HACCP API 응답의 전체 건수"""
+    try:
+        return int((result.get('body') or {}).get('totalCount') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def foodqr_items(result):
+    """
+    FoodQR API 응답에서 제품 목록 추출
+
+    응답 구조: {"response": {"body": {"items": {"item": {...}} 또는 [{"item": {...}}, ...]}}}
+    items가 dict 하나로 오거나 ({"item": [...]} 포함), 각 항목이 {"item": {...}}로 감싸져 오는 경우를 모두 처리합니다.
+    """
+    body = (result.get('response') or {}).get('body') or {}
+    return list(_flatten_items(body.get('items')))
+
+
+def foodqr_item(result):
+    """FoodQR API 응답에서 첫 번째 제품 추출 (없으면 None)"""
+    products = foodqr_items(result)
+    return products[0] if products else None
+
+
+def foodqr_total_count(result):
+    """FoodQR API 응답의 전체 건수"""
+    try:
+        return int(((result.get('response') or {}).get('body') or {}).get('totalCount') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def c005_result(result):
+    """
+    C005 API 응답에서 (결과 코드, 메시지, 전체 건수, 행 목록) 추출
+
+    응답 구조: {"C005": {"total_count": "1", "row": [...], "RESULT": {"CODE": ..., "MSG": ...}}}
+    INFO-000: 정상 처리, INFO-200: 해당하는 데이터가 없습니다
+    """
+    c005_data = result.get('C005') or {}
+    result_info = c005_data.get('RESULT') or {}
+
+    try:
+        total_count = int(c005_data.get('total_count') or 0)
+    except (TypeError, ValueError):
+        total_count = 0
+
+    return result_info.get('CODE'), result_info.get('MSG'), total_count, c005_data.get('row') or []
+
+
+def c005_mapping(row, barcode=None):
+    """C005 행을 바코드 → 품목보고번호 매핑 형식으로 변환"""
+    return {
+        'product_report_no': row.get('PRDLST_REPORT_NO'),
+        'product_name': row.get('PRDLST_NM', 'Unknown'),
+        'barcode': barcode or row.get('BAR_CD', ''),
+        'manufacturer': row.get('BSSH_NM', ''),
+        'product_type': row.get('PRDLST_DCNM', ''),
+        'report_date': row.get('PRMS_DT', ''),
+        'address': row.get('SITE_ADDR', '')
+    }
+
+
+# ★ 스트리밍 파싱 (응답 본문 조각 → 제품을 하나씩) ★
+# 본문 전체를 dict로 만들지 않으므로 큰 목록 응답도 메모리를 제품 하나 정도만 사용
+# meta를 넘기면 전체 건수 등 목록 밖의 값을 채워 줌 (순회가 끝난 뒤 확인)
+
+def _iter_stream_items(chunks, items_path, meta_paths, meta):
+    targets = [items_path, items_path + ('item',), *meta_paths.values()]
+    names = {path: name for name, path in meta_paths.items()}
+
+    for path, value in iter_json_paths(chunks, targets):
+        if path in names:
+            if meta is not None:
+                meta[names[path]] = value
+        else:
+            yield from _flatten_items(value)
+
+
+def _count(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_haccp_stream(chunks, meta=None):
+    """HACCP API 응답 조각 → 제품 (meta['total_count']: 전체 건수)"""
+    meta = {} if meta is None else meta
+    yield from _iter_stream_items(chunks, ('body', 'items'), {'total_count': ('body', 'totalCount')}, meta)
+    meta['total_count'] = _count(meta.get('total_count'))
+
+
+def iter_foodqr_stream(chunks, meta=None):
+    """FoodQR API 응답 조각 → 제품 (meta['total_count']: 전체 건수)"""
+    meta = {} if meta is None else meta
+    yield from _iter_stream_items(
+        chunks, ('response', 'body', 'items'), {'total_count': ('response', 'body', 'totalCount')}, meta
+    )
+    meta['total_count'] = _count(meta.get('total_count'))
+
+
+def iter_c005_stream(chunks, meta=None):
+    """
+    C005 API 응답 조각 → 행 (meta: total_count, result_code, result_msg)
+
+    결과 코드는 행 뒤에 올 수도 있으므로 순회가 끝난 뒤 확인합니다.
+    """
+    meta = {} if meta is None else meta
+    paths = {'total_count': ('C005', 'total_count'), 'result': ('C005', 'RESULT')}
+
+    for path, value in iter_json_paths(chunks, [('C005', 'row'), *paths.values()]):
+        if path == paths['total_count']:
+            meta['total_count'] = value
+        elif path == paths['result']:
+            meta['result_code'] = (value or {}).get('CODE')
+            meta['result_msg'] = (value or {}).get('MSG')
+        elif value:
+            yield value
+
+    meta['total_count'] = _count(meta.get('total_count'))
+
+
+def iter_pages(fetch_page, page_size, limit=None):
+    """
+    ★ 여러 행이 필요한 조회용 지연 페이지 순회 ★
+
+    fetch_page(page_no, page_size)가 돌려준 (행 반복자, meta)의 행을 하나씩 반환합니다.
+    meta['total_count']는 행을 모두 읽은 뒤 확인하므로 스트리밍 파서를 그대로 쓸 수 있습니다.
+    다음 페이지는 앞 페이지의 행을 모두 소비한 뒤에야 요청하므로, 필요한 만큼만 읽고 멈추면
+    나머지 페이지는 요청하지 않습니다. limit가 page_size보다 작으면 limit개짜리 페이지 하나만 요청합니다.
+    """
+    if limit is not None:
+        if limit <= 0:
+            return
+        page_size = min(page_size, limit)
+
+    returned = 0
+    page_no = 1
+
+    while True:
+        rows, meta = fetch_page(page_no, page_size)
+        page_rows = 0
+
+        for row in rows:
+            yield row
+            page_rows += 1
+            returned += 1
+
+            if limit is not None and returned >= limit:
+                return
+
+        if page_rows < page_size or page_no * page_size >= meta.get('total_count', 0):
+            return
+
+        page_no += 1
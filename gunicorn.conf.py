@@ -0,0 +1,25 @@
+# gunicorn 설정 (gunicorn은 현재 디렉터리의 gunicorn.conf.py를 자동으로 읽음)
+import os
+import sys
+
+
+# GUNICORN_PRELOAD=1: 마스터 프로세스에서 앱을 한 번 불러온 뒤 워커를 fork
+# (워커마다 모듈을 불러오지 않으므로 워커 시작이 빠르고, 불러온 모듈의 메모리를 워커끼리 공유)
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+
+# 명령줄에서 앱을 지정하지 않은 경우 사용할 애플리케이션 팩토리
+wsgi_app = f'app:create_app(preload={preload_app})'
+
+
+def post_fork(server, worker):
+    """preload 모드에서 부모 프로세스에서 만든 로깅 스레드/클라이언트를 워커에서 다시 준비"""
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.reset_after_fork()
+
+
+def child_exit(server, worker):
+    """종료된 워커의 Prometheus 메트릭 파일 정리 (PROMETHEUS_MULTIPROC_DIR 사용 시)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,146 @@
+"""
+FoodQR 전자라벨(prvwCn) HTML → 원재료명 텍스트
+
+strip_html은 정규식 한 번으로 태그를 제거하는 빠른 경로를 먼저 시도하고, 스크립트/스타일,
+선언(<!DOCTYPE>), 짝이 맞지 않는 '<' 등 HTMLParser와 결과가 달라질 수 있는 입력은
+기존 HTMLParser 방식(strip_html_reference)으로 처리합니다. 두 결과가 같다는 것은
+bench/check_strip_html.py로 확인합니다.
+"""
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+
+class HTMLStripper(HTMLParser):
+    """HTML 태그 제거"""
+    def __init__(self):
+        super().__init__()
+        self.reset()
+        self.strict = False
+        self.convert_charrefs = True
+        self.text = []
+
+
+    def handle_data(self, d):
+        self.text.append(d)
+
+
+    def get_data(self):
+        return ''.join(self.text)
+
+
+def strip_html_reference(html_text):
+    """HTMLParser로 태그 제거 (기준 구현, 빠른 경로로 처리할 수 없는 입력용)"""
+    if not html_text:
+        return ''
+
+    stripper = HTMLStripper()
+    try:
+        stripper.feed(html_text)
+        return stripper.get_data().replace('\n', '').replace('  ', ' ').strip()
+    except:
+        text = re.sub(r'<[^>]+>', '', html_text)
+        text = re.sub(r'\s+', ' ', text)
+        return text.strip()
+
+
+# HTMLParser와 같은 범위로 인식되는 것이 확실한 마크업만 허용
+# (잘 닫힌 시작/끝 태그, 주석). 나머지 '<'가 남으면 기준 구현으로 처리
+_MARKUP = re.compile(
+    r'<!--[\s\S]*?--\s*>'
+    r'|</[a-zA-Z][-a-zA-Z0-9:._]*\s*>'
+    r'|<[a-zA-Z][-a-zA-Z0-9:._]*'
+    r'(?:\s+[a-zA-Z_:][-\w:.]*(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'=<>`]+))?)*'
+    r'\s*/?>'
+)
+# HTMLParser가 내용을 텍스트로 그대로 넘기는 요소
+_CDATA_ELEMENT = re.compile(r'<(?:script|style)', re.IGNORECASE)
+_TRAILING_CHARREF_END = re.compile(r'[\s;]')
+
+
+def strip_html(html_text):
+    """HTML 태그 제거 함수 (strip_html_reference와 같은 결과)"""
+    if not html_text:
+        return ''
+
+    if '<' not in html_text and '&' not in html_text:
+        return html_text.replace('\n', '').replace('  ', ' ').strip()
+
+    if _CDATA_ELEMENT.search(html_text):
+        return strip_html_reference(html_text)
+
+    # 태그 사이의 텍스트 조각 (엔티티는 HTMLParser처럼 조각별로 변환)
+    chunks = _MARKUP.split(html_text)
+    last = chunks[-1]
+
+    # 남은 '<'는 HTMLParser가 다르게 해석할 수 있는 마크업
+    if any('<' in chunk for chunk in chunks):
+        return strip_html_reference(html_text)
+
+    # HTMLParser는 feed()만 호출하면 끝부분의 끝나지 않은 문자 참조(&...)를 포함한 마지막 조각을 버림
+    amppos = last.rfind('&', max(0, len(last) - 34))
+    if amppos >= 0 and not _TRAILING_CHARREF_END.search(last, amppos):
+        return strip_html_reference(html_text)
+
+    text = ''.join(unescape(chunk) if '&' in chunk else chunk for chunk in chunks)
+    return text.replace('\n', '').replace('  ', ' ').strip()
+
+
+def _normalize_stream(pieces):
+    """
+    strip_html의 .replace('\\n', '').replace('  ', ' ').strip()을 조각 단위로 적용
+
+    조각 끝의 공백은 다음 조각과 이어질 수 있으므로 다음 글자가 올 때까지 보류합니다.
+    """
+    started = False
+    pending = ''
+
+    for piece in pieces:
+        piece = piece.replace('\n', '')
+        if not piece:
+            continue
+
+        text = pending + piece
+        body = text.rstrip()
+        pending = text[len(body):]
+
+        if not body:
+            continue
+
+        if not started:
+            body = body.lstrip()
+            started = True
+
+        yield body.replace('  ', ' ')
+
+
+def iter_strip_html(chunks):
+    """
+    ★ 큰 전자라벨용 스트리밍 모드 ★
+
+    HTML을 조각(chunks) 단위로 받아 텍스트를 조각 단위로 반환합니다.
+    전체 HTML과 결과 문자열을 한꺼번에 메모리에 두지 않으며,
+    이어 붙인 결과는 strip_html(''.join(chunks))와 같습니다.
+    """
+    stripper = HTMLStripper()
+
+    def pieces():
+        buffer = ''
+
+        for chunk in chunks:
+            buffer += chunk
+            # 마지막 '<' 앞까지만 넘겨서 텍스트 조각이 한 번에 feed()될 때와 같은 단위로 처리되도록 함
+            cut = buffer.rfind('<')
+            if cut <= 0:
+                continue
+
+            stripper.feed(buffer[:cut])
+            buffer = buffer[cut:]
+
+            text, stripper.text = stripper.text, []
+            yield from text
+
+        stripper.feed(buffer)
+        yield from stripper.text
+
+    return _normalize_stream(pieces())
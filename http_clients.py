@@ -0,0 +1,126 @@
+"""공공 API 호출용 호스트별 HTTP 연결 풀과 지연 생성 클라이언트"""
+import os
+import threading
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HTTPClientPool:
+    """
+    ★ 호스트별 keep-alive 세션 관리 ★
+
+    apis.data.go.kr, foodqr.kr, openapi.foodsafetykorea.go.kr 등 호스트마다
+    requests.Session 하나를 두고 연결을 재사용하여, 요청마다 TCP/TLS 연결을
+    새로 맺는 비용을 없앱니다.
+    """
+    def __init__(self, pool_maxsize=32, connect_timeout=3.05, read_timeout=15, host_pool_sizes=None):
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # 호스트별 풀 크기 ({'foodqr.kr': 16} 형식), 없으면 pool_maxsize 사용
+        self.host_pool_sizes = host_pool_sizes or {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+
+    def _new_session(self, host):
+        pool_size = self.host_pool_sizes.get(host, self.pool_maxsize)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+
+    def session_for(self, url):
+        """URL의 호스트에 해당하는 세션 반환"""
+        host = urllib.parse.urlsplit(url).netloc
+
+        with self._lock:
+            # fork 이후에는 부모 프로세스의 소켓을 공유하지 않도록 새로 생성
+            if self._pid != os.getpid():
+                self._sessions = {}
+                self._pid = os.getpid()
+
+            session = self._sessions.get(host)
+
+            if session is None:
+                session = self._sessions[host] = self._new_session(host)
+
+            return session
+
+
+    def get(self, url, timeout=None, **kwargs):
+        """GET 요청 (timeout 미지정 시 (연결, 읽기) 기본 타임아웃 사용)"""
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+
+        return self.session_for(url).get(url, timeout=timeout, **kwargs)
+
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+
+class LazyClient:
+    """
+    ★ 처음 사용할 때 만드는 클라이언트 (Supabase 등) ★
+
+    모듈을 불러올 때가 아니라 처음 get()을 호출할 때 factory로 만들어, 설정이 없거나 잘못되어도
+    워커 시작은 실패하지 않습니다. 여러 스레드가 동시에 호출해도 한 번만 만들고,
+    fork 이후(gunicorn preload)에는 부모 프로세스의 클라이언트를 쓰지 않고 새로 만듭니다.
+    만들기에 실패하면 저장하지 않으므로 다음 호출에서 다시 시도합니다.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+        # (만든 프로세스 pid, 클라이언트)
+        self._state = (None, None)
+
+
+    def get(self):
+        pid, client = self._state
+
+        if client is not None and pid == os.getpid():
+            return client
+
+        with self._lock:
+            pid, client = self._state
+
+            if client is None or pid != os.getpid():
+                client = self.factory()
+                self._state = (os.getpid(), client)
+
+            return client
+
+
+    @property
+    def initialized(self):
+        pid, client = self._state
+        return client is not None and pid == os.getpid()
+
+
+    def reset(self):
+        """다음 get()에서 다시 만들도록 버림"""
+        with self._lock:
+            self._state = (None, None)
+
+
+def parse_host_pool_sizes(value):
+    """'foodqr.kr=16,apis.data.go.kr=32' 형식의 환경 변수 파싱"""
+    sizes = {}
+
+    for item in (value or '').split(','):
+        host, _, size = item.strip().partition('=')
+
+        if host and size.isdigit():
+            sizes[host] = int(size)
+
+    return sizes
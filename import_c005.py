@@ -0,0 +1,110 @@
+"""
+C005 바코드연계제품정보 데이터셋 일괄 가져오기
+
+사용법:
+    python import_c005.py            # 체크포인트부터 이어서 가져오기
+    python import_c005.py --restart  # 처음부터 다시 가져오기
+
+가져온 바코드 → 품목보고번호 매핑은 /search에서 네트워크 요청 없이 사용됩니다.
+"""
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+
+from food_apis import c005_mapping, iter_c005_stream
+from http_clients import HTTPClientPool
+from json_stream import CHUNK_SIZE
+from local_store import BarcodeMappingStore
+
+
+load_dotenv()
+
+
+BARCODE_LINK_API_URL = os.getenv('BARCODE_LINK_API_URL', 'http://openapi.foodsafetykorea.go.kr/api')
+FOOD_SAFETY_API_KEY = os.getenv('FOOD_SAFETY_API_KEY')
+LOCAL_STORE_DB = os.getenv('LOCAL_STORE_DB', 'local_store.db')
+MAPPING_REFRESH_DAYS = int(os.getenv('MAPPING_REFRESH_DAYS', 30))
+
+# 식품안전나라 OpenAPI는 한 번에 최대 1000건까지 조회 가능
+MAX_RANGE_SIZE = 1000
+
+
+def fetch_range(http_pool, start, end, retries=3):
+    """
+    C005 데이터셋의 start~end 구간 조회 → (결과 코드, 메시지, 전체 건수, 행 목록) (실패 시 재시도)
+
+    응답은 받는 대로 스트리밍 파싱합니다.
+    """
+    # 형식: /api/{인증키}/C005/{dataType}/{startIdx}/{endIdx}
+    url = f"{BARCODE_LINK_API_URL}/{FOOD_SAFETY_API_KEY}/C005/json/{start}/{end}"
+
+    for attempt in range(1, retries + 1):
+        try:
+            with http_pool.get(url, stream=True) as response:
+                if response.status_code == 200:
+                    meta = {}
+                    rows = list(iter_c005_stream(response.iter_content(CHUNK_SIZE), meta))
+                    return meta.get('result_code'), meta.get('result_msg'), meta['total_count'], rows
+
+                print(f"[Import] {start}-{end}: status {response.status_code} (attempt {attempt})")
+        except Exception as e:
+            print(f"[Import] {start}-{end}: {str(e)} (attempt {attempt})")
+
+        time.sleep(2 ** attempt)
+
+    raise RuntimeError(f'Failed to fetch range {start}-{end}')
+
+
+def import_dataset(store, range_size=MAX_RANGE_SIZE, restart=False, delay=0.2):
+    """
+    ★ C005 전체 데이터셋을 구간 단위로 가져와 바코드 색인에 저장 ★
+
+    구간마다 체크포인트를 저장하므로 중단되어도 마지막 구간부터 이어서 진행합니다.
+    """
+    http_pool = HTTPClientPool(pool_maxsize=1)
+
+    start = 1 if restart else int(store.get_state('c005.next_start', 1))
+    total_count = None
+    saved = 0
+
+    while total_count is None or start <= total_count:
+        end = start + range_size - 1
+        result_code, result_msg, total_count, rows = fetch_range(http_pool, start, end)
+
+        if result_code == 'INFO-200' or not rows:
+            break
+
+        if result_code and result_code != 'INFO-000':
+            raise RuntimeError(f'C005 API Error: {result_code} - {result_msg}')
+
+        saved += store.put_many(c005_mapping(row) for row in rows)
+        store.set_state('c005.next_start', end + 1)
+
+        print(f"[Import] {start}-{min(end, total_count)}/{total_count}: {saved} mappings saved")
+        start = end + 1
+        time.sleep(delay)
+
+    # 완료 후 다음 실행은 처음부터 (갱신)
+    store.set_state('c005.next_start', 1)
+    store.set_state('c005.total_count', total_count or 0)
+    store.set_state('c005.last_import', time.time())
+
+    print(f"[Import] ✓ Done: {saved} mappings saved, {store.count()} barcodes in index")
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='C005 바코드연계제품정보 데이터셋 일괄 가져오기')
+    parser.add_argument('--restart', action='store_true', help='체크포인트를 무시하고 처음부터 가져오기')
+    parser.add_argument('--range-size', type=int, default=MAX_RANGE_SIZE, help='요청당 건수 (최대 1000)')
+    parser.add_argument('--delay', type=float, default=0.2, help='요청 간격 (초)')
+    parser.add_argument('--db', default=LOCAL_STORE_DB, help='로컬 저장소 SQLite 파일')
+    args = parser.parse_args()
+
+    if not FOOD_SAFETY_API_KEY:
+        raise SystemExit('FOOD_SAFETY_API_KEY not set')
+
+    store = BarcodeMappingStore(args.db, refresh_after=MAPPING_REFRESH_DAYS * 86400)
+    import_dataset(store, range_size=min(args.range_size, MAX_RANGE_SIZE), restart=args.restart, delay=args.delay)
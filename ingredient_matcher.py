@@ -0,0 +1,87 @@
+"""원재료명 키워드 검출기 (한 번 컴파일한 정규식으로 한 번에 검색)"""
+import hashlib
+import json
+import re
+
+
+def _trie_pattern(keywords):
+    """키워드 목록을 공통 접두사끼리 묶은 정규식으로 변환 (예: 닭(?:고기|다리)?)"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+
+        if not alternatives:
+            return ''
+
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+# 검출 방식이 바뀌어 같은 키워드 표에서도 결과가 달라질 때 올림
+ALGORITHM_VERSION = 1
+
+
+def matcher_version(ingredients):
+    """키워드 표와 검출 방식에 따라 정해지는 버전 문자열 (저장된 분석 결과가 최신인지 확인용)"""
+    table = json.dumps(ingredients, ensure_ascii=False, sort_keys=True)
+    return f'{ALGORITHM_VERSION}-' + hashlib.sha1(table.encode('utf-8')).hexdigest()[:12]
+
+
+class IngredientMatcher:
+    """
+    ★ INGREDIENTS_TO_CHECK 전체를 한 번에 검색하는 검출기 ★
+
+    각 위치에서 시작하는 가장 긴 키워드를 찾고, 그 키워드의 접두사인 키워드들도
+    함께 검출된 것으로 처리합니다. 같은 위치에서 일치하는 키워드는 모두 서로의
+    접두사이므로, 키워드마다 `in` 검사를 하는 것과 결과가 같습니다.
+    """
+    def __init__(self, ingredients):
+        self.ingredients = ingredients
+        self.version = matcher_version(ingredients)
+
+        keywords = {keyword for data in ingredients.values() for keyword in data['keywords']}
+        first_chars = ''.join(sorted({keyword[0] for keyword in keywords}))
+
+        # 겹치는 키워드(예: 우유/유청)도 찾도록 전방 탐색으로 폭 0 일치
+        self.pattern = re.compile(
+            '(?=[' + re.escape(first_chars) + '])(?=(' + _trie_pattern(keywords) + '))'
+        )
+        self.prefixes = {
+            keyword: frozenset(other for other in keywords if keyword.startswith(other))
+            for keyword in keywords
+        }
+        self.categories = [
+            (category, data['english'], data['keywords'], frozenset(data['keywords']))
+            for category, data in ingredients.items()
+        ]
+
+
+    def find(self, raw_materials):
+        """원재료명에서 해당하는 모든 원재료 검출 (find_ingredients와 같은 형식)"""
+        found_keywords = set()
+        for longest in set(self.pattern.findall(raw_materials)):
+            found_keywords |= self.prefixes[longest]
+
+        found_ingredients = {}
+
+        if not found_keywords:
+            return found_ingredients
+
+        for category, english, keywords, keyword_set in self.categories:
+            if keyword_set.isdisjoint(found_keywords):
+                continue
+
+            found_ingredients[category] = {
+                'english': english,
+                'detected': [keyword for keyword in keywords if keyword in found_keywords]
+            }
+
+        return found_ingredients
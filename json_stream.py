@@ -0,0 +1,167 @@
+"""
+큰 JSON 응답의 점진적 파싱
+
+응답 본문 전체를 json.loads로 한 번에 만들지 않고, 조각(chunks)을 읽어 가며 지정한 경로의
+값만 하나씩 만들어 반환합니다. 경로에 있는 배열은 원소 단위로 반환하므로, 메모리에는
+읽는 중인 조각과 원소 하나 정도만 남습니다.
+"""
+import codecs
+import json
+
+
+# 응답 본문을 읽는 조각 크기 (response.iter_content(CHUNK_SIZE))
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+# 이미 처리한 버퍼 앞부분을 잘라낼 크기
+_COMPACT_AT = 1 << 16
+
+
+class _Reader:
+    """조각 단위로 읽으며 필요한 만큼 버퍼에 채우는 JSON 읽기 도우미"""
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decode = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+
+    def _read_more(self):
+        if self.eof:
+            return False
+
+        if self.pos >= _COMPACT_AT:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.decode.decode(chunk)
+            if chunk:
+                self.buffer += chunk
+                return True
+
+        self.eof = True
+        self.buffer += self.decode.decode(b'', final=True)
+        return False
+
+
+    def peek(self):
+        """다음 공백이 아닌 문자 (끝이면 '')"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self._read_more():
+                return ''
+
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f'Expecting one of {chars!r}', self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+
+    def value(self):
+        """다음 JSON 값 하나를 만들어 반환 (조각 경계에 걸쳐 있으면 더 읽어서 다시 시도)"""
+        self.peek()
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+
+            # 숫자는 조각 경계에서 잘렸어도 앞부분만으로 해석되므로 ('12' + '3', '3.' + '5'),
+            # 뒤에 숫자가 이어질 수 있으면 더 읽어서 다시 확인
+            if (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS) and self._read_more():
+                continue
+
+            self.pos = end
+            return value
+
+
+def _walk(reader, path, targets, prefixes):
+    char = reader.peek()
+
+    # 더 깊은 대상 경로가 있는 객체는 펼쳐서 들어감 (예: items → items.item)
+    if path in prefixes and char == '{':
+        # 경로 자체도 대상이면, 더 깊은 대상 키가 없을 때 객체 전체를 값으로 반환 (예: items가 제품 dict 하나)
+        rest = {} if path in targets else None
+        deeper = False
+
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+            if rest is not None:
+                yield path, rest
+            return
+
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            child = path + (key,)
+
+            if rest is not None and child not in targets and child not in prefixes:
+                rest[key] = reader.value()
+            else:
+                deeper = True
+                yield from _walk(reader, child, targets, prefixes)
+
+            if reader.expect(',}') == '}':
+                break
+
+        if rest is not None and not deeper:
+            yield path, rest
+        return
+
+    if path not in targets:
+        reader.value()
+        return
+
+    if char != '[':
+        yield path, reader.value()
+        return
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+        return
+
+    while True:
+        yield path, reader.value()
+
+        if reader.expect(',]') == ']':
+            return
+
+
+def iter_json_paths(chunks, targets):
+    """
+    ★ 조각 단위 JSON에서 지정한 경로의 값을 하나씩 반환 ★
+
+    chunks: 응답 본문 조각 (bytes 또는 str, 예: response.iter_content(65536))
+    targets: 키 경로 튜플 목록 (예: [('body', 'items'), ('body', 'totalCount')])
+
+    (경로, 값)을 문서 순서대로 반환하며, 경로의 값이 배열이면 원소마다 하나씩 반환합니다.
+    대상이 아닌 값은 만든 뒤 바로 버리므로, 대상 밖의 큰 값은 그만큼 메모리를 씁니다.
+    """
+    targets = {tuple(target) for target in targets}
+    prefixes = {target[:i] for target in targets for i in range(len(target))}
+    reader = _Reader(chunks)
+
+    yield from _walk(reader, (), targets, prefixes)
+
+    if reader.peek():
+        raise json.JSONDecodeError('Extra data', reader.buffer, reader.pos)
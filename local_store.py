@@ -0,0 +1,275 @@
+"""로컬 SQLite 저장소 (바코드 → 품목보고번호 매핑, HACCP 데이터셋 사본)"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from product_record import ProductRecord, from_haccp
+
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStore:
+    """
+    스레드/프로세스 안전한 SQLite 연결 관리
+
+    스레드마다 별도 연결을 사용하고, gunicorn fork 이후에는 새 연결을 엽니다.
+    ★ 파일은 처음 사용할 때 열고 스키마를 만듭니다 ★ (import 시에는 열지 않음)
+    열 수 없는 경로여도 앱은 시작되며, 호출마다 sqlite3.Error가 발생하고 /readyz(ping)가 실패를 보고합니다.
+    """
+    SCHEMA = ()
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+
+        # fork 이후에는 부모 프로세스의 연결을 재사용하지 않음
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        if not self._schema_ready:
+            self._create_schema(conn)
+
+        return conn
+
+
+    def _create_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+
+            with conn:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                self.migrate(conn)
+
+            self._schema_ready = True
+
+
+    def migrate(self, conn):
+        """스키마를 만든 직후 실행할 작업 (하위 클래스에서 재정의)"""
+
+
+    def ping(self):
+        """연결 확인 (레디니스 프로브용)"""
+        self._connect().execute('SELECT 1').fetchone()
+
+
+SYNC_STATE_SCHEMA = 'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)'
+
+
+class SyncStateMixin:
+    """동기화/가져오기 작업의 진행 상황(체크포인트) 저장"""
+    def get_state(self, key, default=None):
+        row = self._connect().execute(
+            'SELECT value FROM sync_state WHERE key = ?', (key,)
+        ).fetchone()
+        return row['value'] if row else default
+
+
+    def set_state(self, key, value):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, str(value))
+            )
+
+
+class BarcodeMappingStore(SyncStateMixin, SQLiteStore):
+    """
+    ★ C005 API로 찾은 바코드 → 품목보고번호 매핑 저장소 ★
+
+    한 번 찾은 매핑을 저장해 두면 같은 바코드를 다시 검색할 때
+    Supabase → HACCP → FoodQR ×2 → C005 순서를 건너뛰고 바로 품목보고번호로 조회합니다.
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS barcode_mapping ('
+        'barcode TEXT PRIMARY KEY, '
+        'product_report_no TEXT NOT NULL, '
+        'product_name TEXT, '
+        'manufacturer TEXT, '
+        'product_type TEXT, '
+        'report_date TEXT, '
+        'address TEXT, '
+        'updated_at REAL NOT NULL)',
+        SYNC_STATE_SCHEMA,
+    )
+
+    def __init__(self, path, refresh_after):
+        super().__init__(path)
+        self.refresh_after = refresh_after
+
+
+    def get(self, barcode):
+        """저장된 매핑 반환 (없으면 None)"""
+        try:
+            row = self._connect().execute(
+                'SELECT * FROM barcode_mapping WHERE barcode = ?', (barcode,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("[Mapping] Read error: %s", e)
+            return None
+
+        return dict(row) if row else None
+
+
+    def is_stale(self, mapping):
+        """갱신 주기가 지난 매핑인지 확인"""
+        return mapping['updated_at'] + self.refresh_after <= time.time()
+
+
+    def claim_refresh(self, barcode):
+        """
+        갱신 주기가 지난 매핑의 갱신을 맡음 (맡았으면 True)
+
+        updated_at을 지금으로 옮겨 두므로, C005 조회가 실패하거나 결과가 없어도 같은 매핑은
+        다음 주기까지 다시 갱신하지 않습니다. 조건부 UPDATE라 여러 워커 중 한 곳만 맡습니다.
+        """
+        now = time.time()
+
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    'UPDATE barcode_mapping SET updated_at = ? WHERE barcode = ? AND updated_at <= ?',
+                    (now, barcode, now - self.refresh_after)
+                )
+        except sqlite3.Error as e:
+            logger.warning("[Mapping] Write error: %s", e)
+            return False
+
+        return cursor.rowcount == 1
+
+
+    def put(self, mapping):
+        """C005 검색 결과 저장 (search_barcode_link_api 반환값 형식)"""
+        self.put_many([mapping])
+
+
+    def put_many(self, mappings):
+        """매핑 여러 건 저장 (import_c005.py 일괄 가져오기용), 저장 건수 반환"""
+        now = time.time()
+        rows = [
+            (
+                mapping['barcode'],
+                mapping['product_report_no'],
+                mapping.get('product_name', ''),
+                mapping.get('manufacturer', ''),
+                mapping.get('product_type', ''),
+                mapping.get('report_date', ''),
+                mapping.get('address', ''),
+                now
+            )
+            for mapping in mappings
+            if mapping.get('barcode') and mapping.get('product_report_no')
+        ]
+
+        if not rows:
+            return 0
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO barcode_mapping '
+                    '(barcode, product_report_no, product_name, manufacturer, product_type, '
+                    'report_date, address, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.warning("[Mapping] Write error: %s", e)
+            return 0
+
+        return len(rows)
+
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM barcode_mapping').fetchone()[0]
+
+
+class HACCPMirrorStore(SyncStateMixin, SQLiteStore):
+    """
+    ★ HACCP 인증 제품 데이터셋 로컬 사본 ★
+
+    sync_haccp.py가 전체 데이터를 페이지 단위로 받아 품목보고번호로 색인해 두고,
+    /search는 네트워크 요청 없이 여기서 먼저 조회합니다.
+    제품은 ProductRecord 배열 형식으로 저장합니다 (이전에 API 항목 전체로 저장된 행도 읽을 수 있음).
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS haccp_products ('
+        'prdlst_report_no TEXT PRIMARY KEY, '
+        'data TEXT NOT NULL, '
+        'updated_at REAL NOT NULL)',
+        SYNC_STATE_SCHEMA,
+    )
+
+    @staticmethod
+    def _load(data):
+        value = json.loads(data)
+        return ProductRecord.from_compact(value) if isinstance(value, list) else from_haccp(value)
+
+
+    def get_entry(self, report_no):
+        """품목보고번호로 (제품 레코드, 저장 시각) 조회 (없으면 None)"""
+        try:
+            row = self._connect().execute(
+                'SELECT data, updated_at FROM haccp_products WHERE prdlst_report_no = ?', (report_no,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("[HACCP Mirror] Read error: %s", e)
+            return None
+
+        return (self._load(row['data']), row['updated_at']) if row else None
+
+
+    def get(self, report_no):
+        """품목보고번호로 제품 레코드 조회 (없으면 None)"""
+        entry = self.get_entry(report_no)
+        return entry[0] if entry else None
+
+
+    def upsert_many(self, records):
+        """HACCP 제품 레코드 저장 (품목보고번호 없는 레코드는 무시), 저장 건수 반환"""
+        now = time.time()
+        rows = [
+            (record.report_no, json.dumps(record.to_compact(), ensure_ascii=False), now)
+            for record in records
+            if record.report_no
+        ]
+
+        if not rows:
+            return 0
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO haccp_products (prdlst_report_no, data, updated_at) '
+                    'VALUES (?, ?, ?)',
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.warning("[HACCP Mirror] Write error: %s", e)
+            return 0
+
+        return len(rows)
+
+
+    def iter_products(self):
+        """저장된 모든 제품 레코드를 하나씩 반환 (전체를 메모리에 올리지 않음)"""
+        for row in self._connect().execute('SELECT data FROM haccp_products ORDER BY prdlst_report_no'):
+            yield self._load(row['data'])
+
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM haccp_products').fetchone()[0]
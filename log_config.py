@@ -0,0 +1,130 @@
+"""구조화 로깅 설정 (레벨, 요청 ID, 샘플링, 비동기 큐 핸들러)"""
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import zlib
+
+
+# 현재 요청 ID (스레드 풀에서 실행되는 검색 단계에도 contextvars로 전달됨)
+request_id_var = contextvars.ContextVar('request_id', default='-')
+
+_listener = None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    모든 로그에 request_id를 붙이고, INFO 이하 로그는 요청 단위로 샘플링
+
+    같은 요청의 로그는 모두 남기거나 모두 버리므로, 샘플링된 요청은 처음부터 끝까지 추적할 수 있습니다.
+    WARNING 이상은 항상 기록합니다.
+    """
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._threshold = int(sample_rate * 10000)
+
+
+    def filter(self, record):
+        request_id = request_id_var.get()
+        record.request_id = request_id
+
+        if self.sample_rate >= 1.0 or record.levelno >= logging.WARNING or request_id == '-':
+            return True
+
+        return zlib.crc32(request_id.encode()) % 10000 < self._threshold
+
+
+class JSONFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나로 기록 (extra로 전달한 필드 포함)"""
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage()
+        }
+
+        for key, value in vars(record).items():
+            if key not in self.RESERVED and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    같은 프로세스의 리스너로 보내는 QueueHandler
+
+    기본 prepare()는 예외를 메시지 문자열에 붙이고 exc_info를 지우므로 (다른 프로세스로 보내기 위한 처리),
+    JSONFormatter가 exc 필드를 만들 수 없습니다. 메시지만 합치고 예외 정보는 그대로 넘깁니다.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(level='INFO', log_format='text', sample_rate=1.0):
+    """
+    ★ 로깅 설정 ★
+
+    로그 기록은 큐에 넣기만 하고, 별도 스레드(QueueListener)가 stdout에 씁니다.
+    요청 처리 스레드가 stdout I/O를 기다리지 않습니다.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+
+    if log_format == 'json':
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+        ))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def restart_after_fork():
+    """
+    fork된 자식 프로세스에서 QueueListener 스레드 다시 시작
+
+    gunicorn preload 모드에서는 부모 프로세스에서 로깅을 설정하므로,
+    워커에는 리스너 스레드가 없어 큐에 쌓인 로그가 기록되지 않습니다.
+    """
+    if _listener is not None:
+        _listener._thread = None
+        _listener.start()
+
+
+def stop_logging():
+    """남은 로그를 모두 기록하고 리스너 종료"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
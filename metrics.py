@@ -0,0 +1,56 @@
+"""
+Prometheus 메트릭 정의
+
+gunicorn 워커가 여러 개일 때는 PROMETHEUS_MULTIPROC_DIR 환경 변수를 (빈 디렉터리로)
+설정해야 /metrics가 모든 워커의 값을 합쳐서 보여줍니다.
+워커가 종료되면 gunicorn.conf.py의 child_exit 훅이 해당 워커의 파일을 정리합니다.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+
+# 공공 API 지연 시간은 수 ms(로컬)부터 타임아웃(15초)까지 분포
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30)
+
+
+REQUESTS = Counter(
+    'scaneat_requests_total', 'HTTP 요청 수', ['endpoint', 'method', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'scaneat_request_duration_seconds', 'HTTP 요청 처리 시간', ['endpoint'], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_LATENCY = Histogram(
+    'scaneat_upstream_duration_seconds', '업스트림(Supabase/공공 API) 호출 시간', ['source'], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter(
+    'scaneat_upstream_errors_total', '업스트림 호출 실패 수', ['source', 'kind']
+)
+CACHE_LOOKUPS = Counter(
+    'scaneat_cache_lookups_total', '검색 결과 캐시 조회 수', ['source', 'result']
+)
+SEARCH_RESOLVED = Counter(
+    'scaneat_search_resolved_total', '검색이 결정된 단계 (not_found: 모든 출처에서 찾지 못함)', ['stage']
+)
+SEARCH_COALESCED = Counter(
+    'scaneat_search_coalesced_total', '진행 중인 같은 검색에 합류하여 결과를 공유한 요청 수'
+)
+FOODQR_PROBES = Counter(
+    'scaneat_foodqr_probes_total', 'FoodQR 검색 방식별 응답 결과 (hit, miss)', ['key', 'result']
+)
+SEARCH_INPUTS = Counter(
+    'scaneat_search_inputs_total', '검색값 형식별 요청 수 (barcode, report_no, ambiguous, invalid)', ['kind']
+)
+
+
+def render():
+    """현재 메트릭을 Prometheus 텍스트 형식으로 반환 (본문, Content-Type)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,245 @@
+"""제품 검색 결과 캐시 (프로세스 내 LRU + 선택적 공유 SQLite 백엔드)"""
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import partial, wraps
+
+from local_store import SQLiteStore
+
+
+logger = logging.getLogger(__name__)
+
+
+# 캐시에 없음을 나타내는 값 (None은 '검색 결과 없음'으로 캐시됨)
+MISSING = object()
+
+_json_dumps = partial(json.dumps, ensure_ascii=False)
+
+
+class LRUCache:
+    """TTL을 지원하는 스레드 안전 LRU 캐시"""
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                return MISSING
+
+            value, expires_at = entry
+
+            if expires_at <= time.time():
+                del self._data[key]
+                return MISSING
+
+            self._data.move_to_end(key)
+            return value
+
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCacheBackend(SQLiteStore):
+    """
+    ★ gunicorn 워커들이 함께 쓰는 로컬 SQLite 캐시 ★
+
+    같은 서버의 모든 워커가 하나의 파일을 공유하므로, 한 워커가 조회한 결과를
+    다른 워커도 네트워크 요청 없이 사용할 수 있습니다.
+    값은 dumps/loads로 직렬화합니다 (기본: JSON).
+    만료된 항목은 purge_every번 쓸 때마다 한 번씩 지웁니다 (0이면 지우지 않음).
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS product_cache ('
+        'key TEXT PRIMARY KEY, value TEXT, expires_at REAL)',
+    )
+    # 저장 형식 버전 (PRAGMA user_version). 다른 버전으로 저장된 항목은 처음 열 때 모두 지움
+    FORMAT_VERSION = 2
+
+    def __init__(self, path, dumps=_json_dumps, loads=json.loads, purge_every=1000):
+        super().__init__(path)
+        self.dumps = dumps
+        self.loads = loads
+        self.purge_every = purge_every
+        self._writes = itertools.count(1)
+
+
+    def migrate(self, conn):
+        if conn.execute('PRAGMA user_version').fetchone()[0] != self.FORMAT_VERSION:
+            conn.execute('DELETE FROM product_cache')
+            conn.execute(f'PRAGMA user_version = {self.FORMAT_VERSION}')
+
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM product_cache WHERE key = ?', (key,)
+        ).fetchone()
+
+        if row is None or row[1] <= time.time():
+            return MISSING, 0
+
+        return self.loads(row[0]), row[1]
+
+
+    def set(self, key, value, expires_at):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO product_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, self.dumps(value), expires_at)
+            )
+
+        # 검색값마다 부정 캐시 항목이 생기므로, 만료된 항목을 지우지 않으면 파일이 계속 커짐
+        if self.purge_every and next(self._writes) % self.purge_every == 0:
+            self.purge_expired()
+
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM product_cache WHERE key = ?', (key,))
+
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM product_cache WHERE expires_at <= ?', (time.time(),))
+
+
+class ProductCache:
+    """
+    ★ 출처별 TTL과 부정 캐시(검색 실패 결과)를 지원하는 2단계 캐시 ★
+
+    1단계: 프로세스 내 LRU (네트워크/디스크 없음)
+    2단계: 선택적 공유 백엔드 (같은 서버의 모든 워커가 공유)
+    """
+    def __init__(self, maxsize=10000, backend=None, on_lookup=None):
+        self.local = LRUCache(maxsize)
+        self.backend = backend
+        # 조회마다 on_lookup(source, 'local' | 'shared' | 'miss') 호출 (메트릭 수집용)
+        self.on_lookup = on_lookup
+
+
+    def _record(self, source, result):
+        if self.on_lookup is not None:
+            self.on_lookup(source, result)
+
+
+    @staticmethod
+    def make_key(source, value):
+        return f'{source}:{value}'
+
+
+    def _lookup(self, source, value):
+        """캐시 조회 → (값 또는 MISSING, 'local' | 'shared' | 'miss')"""
+        key = self.make_key(source, value)
+        result = self.local.get(key)
+
+        if result is not MISSING:
+            return result, 'local'
+
+        if self.backend is not None:
+            try:
+                result, expires_at = self.backend.get(key)
+            except sqlite3.Error as e:
+                logger.warning("[Cache] Backend read error: %s", e)
+                result = MISSING
+
+            if result is not MISSING:
+                self.local.set(key, result, expires_at)
+                return result, 'shared'
+
+        return MISSING, 'miss'
+
+
+    def get(self, source, value, record=True):
+        """
+        캐시 조회 (없으면 MISSING)
+
+        record=False면 on_lookup을 호출하지 않습니다.
+        (배치 미리 조회처럼 같은 값을 곧 다시 조회하는 경우 메트릭이 두 번 집계되지 않도록)
+        """
+        result, where = self._lookup(source, value)
+
+        if record:
+            self._record(source, where)
+        return result
+
+
+    def set(self, source, value, result, ttl):
+        key = self.make_key(source, value)
+        expires_at = time.time() + ttl
+        self.local.set(key, result, expires_at)
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, result, expires_at)
+            except sqlite3.Error as e:
+                logger.warning("[Cache] Backend write error: %s", e)
+
+
+    def invalidate(self, source, value):
+        key = self.make_key(source, value)
+        self.local.delete(key)
+
+        if self.backend is not None:
+            try:
+                self.backend.delete(key)
+            except sqlite3.Error as e:
+                logger.warning("[Cache] Backend delete error: %s", e)
+
+
+    def cached(self, source, ttl, negative_ttl, error_counter=None):
+        """
+        검색 함수 캐시 데코레이터
+
+        결과가 None(검색 실패)이면 negative_ttl 동안만 캐시하여,
+        존재하지 않는 바코드가 반복 조회될 때 전체 검색을 다시 하지 않도록 합니다.
+        error_counter가 주어지면 호출 중 업스트림 오류가 있었던 None 결과는 캐시하지 않습니다.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(search_value):
+                result = self.get(source, search_value)
+
+                if result is not MISSING:
+                    return result
+
+                errors_before = error_counter() if error_counter else 0
+                result = func(search_value)
+
+                if result is not None:
+                    self.set(source, search_value, result, ttl)
+                elif not error_counter or error_counter() == errors_before:
+                    self.set(source, search_value, result, negative_ttl)
+
+                return result
+
+            wrapper.uncached = func
+            return wrapper
+        return decorator
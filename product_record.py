@@ -0,0 +1,123 @@
+"""
+정규화된 제품 레코드 (출처별 응답 형식 → 공통 필드)
+
+HACCP(prdlstNm/rawmtrl), FoodQR(prdctNm/prvwCn), Supabase(product_name/raw_materials)의
+제품을 같은 필드로 옮겨 담습니다. 검색 결과 캐시와 HACCP 로컬 사본에는 업스트림 dict 전체 대신
+응답에 필요한 필드만 담은 이 레코드를 보관합니다.
+"""
+import json
+
+from html_text import strip_html
+
+
+# 출처 이름 (응답 페이로드의 source와 같음)
+HACCP = 'HACCP'
+FOODQR = 'FoodQR'
+CUSTOM_DATABASE = 'Custom Database'
+
+
+class ProductRecord:
+    """
+    ★ 검색된 제품 하나 ★
+
+    __slots__만 사용하므로 인스턴스마다 속성 dict가 없어, 같은 제품의 업스트림 dict보다 훨씬 작습니다.
+    저장할 때는 to_compact()로 필드 순서대로의 배열(뒤쪽의 빈 필드 생략)로 바꿉니다.
+    """
+    __slots__ = (
+        'source', 'name', 'raw_materials', 'report_no', 'barcode',
+        'search_method', 'row_id', 'found_ingredients', 'matcher_version'
+    )
+
+    def __init__(self, source, name, raw_materials='', report_no=None, barcode=None,
+                 search_method=None, row_id=None, found_ingredients=None, matcher_version=None):
+        self.source = source
+        self.name = name
+        self.raw_materials = raw_materials
+        self.report_no = report_no
+        self.barcode = barcode
+        # FoodQR에서 찾은 검색 방식 (imrptNo/brcdNo)
+        self.search_method = search_method
+        # custom_products 행 id와 저장된 분석 결과
+        self.row_id = row_id
+        self.found_ingredients = found_ingredients
+        self.matcher_version = matcher_version
+
+
+    def name_or(self, default):
+        """제품명 (업스트림 응답에 없으면 default)"""
+        return default if self.name is None else self.name
+
+
+    def to_compact(self):
+        values = [getattr(self, field) for field in self.__slots__]
+
+        while values and values[-1] is None:
+            values.pop()
+
+        return values
+
+
+    @classmethod
+    def from_compact(cls, values):
+        return cls(*values)
+
+
+    def __eq__(self, other):
+        if not isinstance(other, ProductRecord):
+            return NotImplemented
+        return self.to_compact() == other.to_compact()
+
+
+    def __repr__(self):
+        return f'ProductRecord({self.source!r}, {self.name!r}, report_no={self.report_no!r}, barcode={self.barcode!r})'
+
+
+def from_haccp(item):
+    """HACCP API 제품 항목 → 레코드"""
+    return ProductRecord(
+        HACCP,
+        item.get('prdlstNm'),
+        item.get('rawmtrl') or '',
+        report_no=item.get('prdlstReportNo'),
+        barcode=item.get('barcode')
+    )
+
+
+def from_foodqr(item, search_method):
+    """FoodQR API 제품 항목 → 레코드 (prvwCn의 HTML 표시사항은 텍스트로 변환하여 보관)"""
+    raw_html = item.get('prvwCn')
+
+    return ProductRecord(
+        FOODQR,
+        item.get('prdctNm'),
+        strip_html(raw_html) if raw_html else '',
+        report_no=item.get('imrptNo'),
+        barcode=item.get('brcdNo'),
+        search_method=search_method
+    )
+
+
+def from_custom_product(row):
+    """Supabase custom_products 행 → 레코드"""
+    return ProductRecord(
+        CUSTOM_DATABASE,
+        row['product_name'],
+        row['raw_materials'] or '',
+        report_no=row.get('imrpt_no'),
+        barcode=row.get('barcode'),
+        row_id=row.get('id'),
+        found_ingredients=row.get('found_ingredients'),
+        matcher_version=row.get('matcher_version')
+    )
+
+
+def dumps(value):
+    """캐시 값 직렬화 (레코드는 JSON 배열, C005 매핑 dict와 None은 그대로)"""
+    if isinstance(value, ProductRecord):
+        value = value.to_compact()
+    return json.dumps(value, ensure_ascii=False)
+
+
+def loads(data):
+    value = json.loads(data)
+    return ProductRecord.from_compact(value) if isinstance(value, list) else value
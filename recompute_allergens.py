@@ -0,0 +1,72 @@
+"""
+custom_products에 저장된 원재료 분석 결과 다시 계산
+
+INGREDIENTS_TO_CHECK(키워드 표)나 검출 방식이 바뀌어 matcher_version이 달라진 행과
+분석 결과가 없는 기존 행을 찾아 다시 분석합니다.
+
+사용법:
+    python recompute_allergens.py              # 이전 버전 행만 갱신
+    python recompute_allergens.py --all        # 모든 행 갱신
+
+검색 중에 이전 버전 행이 조회되면 app.py가 해당 행만 백그라운드에서 갱신하므로,
+이 작업은 키워드 표를 바꾼 배포 후 한 번 실행하면 됩니다.
+"""
+import argparse
+import time
+
+from app import allergen_analysis, call_upstream, get_supabase, ingredient_matcher, _or_filter, _postgrest_quote
+
+
+def fetch_rows(after_id, batch_size, all_rows=False):
+    """id가 after_id보다 큰 갱신 대상 행 조회 (id 순)"""
+    query = get_supabase().table('custom_products').select('id,raw_materials,matcher_version')
+    query = query.gt('id', after_id).order('id').limit(batch_size)
+
+    if not all_rows:
+        version = _postgrest_quote(ingredient_matcher.version)
+        query = _or_filter(query, f'matcher_version.is.null,matcher_version.neq.{version}')
+
+    return call_upstream('supabase', query.execute).data or []
+
+
+def recompute(batch_size=500, all_rows=False, delay=0.0):
+    """
+    ★ 갱신 대상 행을 id 순으로 나누어 다시 분석하고 저장 ★
+
+    갱신에 실패한 행은 건너뛰고 다음 실행에서 다시 시도합니다.
+    """
+    after_id = 0
+    updated = 0
+    failed = 0
+
+    while True:
+        rows = fetch_rows(after_id, batch_size, all_rows)
+
+        if not rows:
+            break
+
+        for row in rows:
+            try:
+                query = get_supabase().table('custom_products').update(allergen_analysis(row['raw_materials'] or '')).eq('id', row['id'])
+                call_upstream('supabase', query.execute)
+                updated += 1
+            except Exception as e:
+                print(f"[Recompute] Product {row['id']}: {str(e)}")
+                failed += 1
+
+        after_id = rows[-1]['id']
+        print(f"[Recompute] Up to id {after_id}: {updated} updated, {failed} failed")
+        time.sleep(delay)
+
+    print(f"[Recompute] ✓ Done: {updated} updated, {failed} failed (matcher version {ingredient_matcher.version})")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='custom_products 원재료 분석 결과 다시 계산')
+    parser.add_argument('--all', action='store_true', help='버전과 관계없이 모든 행 갱신')
+    parser.add_argument('--batch-size', type=int, default=500, help='한 번에 조회할 행 수')
+    parser.add_argument('--delay', type=float, default=0.0, help='배치 간격 (초)')
+    args = parser.parse_args()
+
+    recompute(batch_size=args.batch_size, all_rows=args.all, delay=args.delay)
@@ -0,0 +1,57 @@
+"""검색값 형식 분류 (바코드 / 품목보고번호 / 잘못된 입력)"""
+import re
+from datetime import datetime
+
+
+BARCODE = 'barcode'
+REPORT_NO = 'report_no'
+# 바코드 검사 숫자도 맞고 품목보고번호 형식에도 맞는 값 (모든 출처에서 검색)
+AMBIGUOUS = 'ambiguous'
+INVALID = 'invalid'
+
+KINDS = (BARCODE, REPORT_NO, AMBIGUOUS, INVALID)
+
+
+# EAN-8, UPC-A(12), EAN-13, GTIN-14
+GTIN_LENGTHS = (8, 12, 13, 14)
+
+# 품목보고번호: 보고 연도(4자리)로 시작하는 10~16자리 숫자 (예: 19780614002123)
+_REPORT_NO = re.compile(r'(?:19[5-9]\d|20\d\d)\d{6,12}')
+
+
+def gtin_check_digit_ok(value):
+    """GTIN(EAN/UPC) 검사 숫자 확인 (오른쪽부터 가중치 3, 1 반복)"""
+    total = sum(int(digit) * (3 if i % 2 == 0 else 1) for i, digit in enumerate(reversed(value[:-1])))
+    return (10 - total % 10) % 10 == int(value[-1])
+
+
+def is_barcode(value):
+    return value.isascii() and value.isdigit() and len(value) in GTIN_LENGTHS and gtin_check_digit_ok(value)
+
+
+def is_report_no(value):
+    return (
+        value.isascii() and _REPORT_NO.fullmatch(value) is not None
+        and int(value[:4]) <= datetime.now().year
+    )
+
+
+def classify(value):
+    """
+    ★ 검색값 형식 분류 ★
+
+    BARCODE: 검사 숫자가 맞는 EAN/UPC 바코드 (품목보고번호 검색으로는 찾을 수 없음)
+    REPORT_NO: 품목보고번호 형식 (바코드 검색으로는 찾을 수 없음)
+    AMBIGUOUS: 두 형식 모두 가능 (19/20으로 시작하는 13·14자리 등)
+    INVALID: 둘 다 아님 (사용자가 직접 추가한 제품만 검색)
+    """
+    barcode = is_barcode(value)
+    report_no = is_report_no(value)
+
+    if barcode and report_no:
+        return AMBIGUOUS
+    if barcode:
+        return BARCODE
+    if report_no:
+        return REPORT_NO
+    return INVALID
@@ -0,0 +1,85 @@
+"""동일한 검색값에 대한 동시 요청 병합 (single-flight)"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    ★ 같은 키로 동시에 들어온 호출을 하나로 합침 ★
+
+    처음 들어온 호출(leader)만 실제로 실행하고, 실행 중에 들어온 같은 키의 호출은
+    그 결과(또는 예외)를 함께 받습니다. 실행이 끝나면 키를 지우므로 결과를 보관하지는 않습니다.
+    (결과 재사용은 ProductCache가 담당)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+
+    def do(self, key, func, *args, **kwargs):
+        """func 실행 결과와 다른 호출의 결과를 공유받았는지 여부를 (결과, shared)로 반환"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+    def in_flight(self):
+        """현재 실행 중인 키 수"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """SingleFlight의 asyncio 버전 (비동기 모드용, 이벤트 루프 하나에서만 사용)"""
+    def __init__(self):
+        self._calls = {}
+
+
+    async def do(self, key, func, *args, **kwargs):
+        """코루틴 함수 func의 실행 결과와 공유 여부를 (결과, shared)로 반환"""
+        future = self._calls.get(key)
+
+        if future is not None:
+            # 기다리던 요청이 취소되어도 leader의 실행에는 영향을 주지 않도록 shield
+            return await asyncio.shield(future), True
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없어도 'exception was never retrieved' 경고가 나지 않도록
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+
+    def in_flight(self):
+        return len(self._calls)
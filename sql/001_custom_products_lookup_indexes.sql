@@ -0,0 +1,12 @@
+-- /search 1단계(Supabase) 조회용 인덱스
+-- search_custom_database는 barcode 또는 imrpt_no 일치 여부를 하나의 or 쿼리로 확인하고,
+-- search_custom_database_batch는 두 컬럼에 대한 in 필터를 사용합니다.
+-- 두 컬럼 모두 인덱스가 있어야 PostgreSQL이 BitmapOr로 처리하여 전체 스캔을 피할 수 있습니다.
+
+create index if not exists custom_products_barcode_idx
+    on custom_products (barcode)
+    where barcode is not null;
+
+create index if not exists custom_products_imrpt_no_idx
+    on custom_products (imrpt_no)
+    where imrpt_no is not null;
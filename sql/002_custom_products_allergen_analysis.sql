@@ -0,0 +1,22 @@
+-- /add-product에서 원재료 분석 결과를 함께 저장
+-- found_ingredients: find_ingredients 결과 (검색 응답의 foundIngredients와 같은 형식)
+-- allergens: 검출된 카테고리 목록 (예: {대두,우유}), DB에서 알레르기 성분으로 제품 조회용
+-- matcher_version: 분석에 사용한 검출기 버전 (INGREDIENTS_TO_CHECK가 바뀌면 달라짐)
+--
+-- 기존 행과 키워드 표가 바뀐 뒤의 행은 recompute_allergens.py로 다시 분석합니다.
+-- app.py가 이 컬럼들을 조회하므로 배포 전에 먼저 적용해야 합니다.
+-- 적용되지 않은 DB에서는 /readyz가 503(customProductsSchema)을 반환합니다.
+
+alter table custom_products
+    add column if not exists found_ingredients jsonb,
+    add column if not exists allergens text[],
+    add column if not exists matcher_version text;
+
+-- 예: 대두와 우유가 없는 제품
+--     select * from custom_products where not (allergens && array['대두', '우유']);
+create index if not exists custom_products_allergens_idx
+    on custom_products using gin (allergens);
+
+-- recompute_allergens.py가 이전 버전으로 분석된 행을 찾을 때 사용
+create index if not exists custom_products_matcher_version_idx
+    on custom_products (matcher_version);
@@ -0,0 +1,134 @@
+"""
+HACCP 인증 제품 데이터셋 로컬 동기화
+
+사용법:
+    python sync_haccp.py                # 전체 동기화 (중단된 경우 이어서 진행)
+    python sync_haccp.py --incremental  # 지난 동기화 이후 늘어난 페이지만 가져오기
+
+★ 증분 동기화는 새로 추가된 제품만 가져오므로, 원재료가 바뀐 기존 제품은 갱신하지 못합니다 ★
+그래서 --incremental로 실행해도 마지막 전체 동기화 후 HACCP_FULL_SYNC_DAYS(기본 7일)가 지났으면
+전체 동기화로 진행합니다 (매일 --incremental로 예약해 두면 주기적으로 전체 동기화됨).
+증분 동기화는 목록 중간의 삭제로 순서가 밀린 경우에 대비해 마지막 페이지부터 다시 가져옵니다.
+검색(app.py)은 HACCP_MIRROR_MAX_AGE_DAYS가 지난 항목 대신 실시간 API를 조회합니다.
+"""
+import argparse
+import os
+import time
+import urllib.parse
+
+from dotenv import load_dotenv
+
+from food_apis import iter_haccp_stream
+from http_clients import HTTPClientPool
+from json_stream import CHUNK_SIZE
+from local_store import HACCPMirrorStore
+from product_record import from_haccp
+
+
+load_dotenv()
+
+
+HACCP_API_URL = os.getenv('HACCP_API_URL', 'https://apis.data.go.kr/B553748/CertImgListServiceV3/getCertImgListServiceV3')
+SERVICE_KEY = os.getenv('SERVICE_KEY')
+LOCAL_STORE_DB = os.getenv('LOCAL_STORE_DB', 'local_store.db')
+
+# 한 번에 받을 수 있는 최대 건수
+MAX_ROWS_PER_PAGE = 100
+# 이 기간(일)이 지나면 --incremental이어도 전체 동기화
+FULL_SYNC_DAYS = float(os.getenv('HACCP_FULL_SYNC_DAYS', 7))
+# 증분 동기화 때 다시 가져올 이전 페이지 수
+OVERLAP_PAGES = 1
+
+
+def fetch_page(http_pool, page_no, num_of_rows, retries=3):
+    """
+    HACCP 데이터셋 한 페이지 조회 → (제품 레코드 목록, 전체 건수) (실패 시 재시도)
+
+    응답은 받는 대로 스트리밍 파싱하므로 본문 전체와 파싱 결과를 함께 메모리에 두지 않습니다.
+    """
+    params = {
+        'serviceKey': urllib.parse.unquote(SERVICE_KEY),
+        'returnType': 'json',
+        'numOfRows': num_of_rows,
+        'pageNo': page_no
+    }
+
+    for attempt in range(1, retries + 1):
+        try:
+            with http_pool.get(HACCP_API_URL, params=params, stream=True) as response:
+                if response.status_code == 200:
+                    meta = {}
+                    products = [from_haccp(item) for item in iter_haccp_stream(response.iter_content(CHUNK_SIZE), meta)]
+                    return products, meta['total_count']
+
+                print(f"[Sync] Page {page_no}: status {response.status_code} (attempt {attempt})")
+        except Exception as e:
+            print(f"[Sync] Page {page_no}: {str(e)} (attempt {attempt})")
+
+        time.sleep(2 ** attempt)
+
+    raise RuntimeError(f'Failed to fetch page {page_no}')
+
+
+def sync(store, incremental=False, num_of_rows=MAX_ROWS_PER_PAGE, delay=0.2):
+    """
+    ★ 전체 데이터셋을 pageNo/numOfRows로 순회하며 로컬에 저장 ★
+
+    - 전체 동기화: 페이지마다 진행 상황을 저장하므로 중단되어도 이어서 진행
+    - 증분 동기화: 지난 동기화 때의 totalCount 이후 페이지만 가져옴
+      (새로 등록된 제품은 목록 끝에 추가됨, OVERLAP_PAGES만큼 앞 페이지부터)
+      마지막 전체 동기화 후 FULL_SYNC_DAYS가 지났으면 전체 동기화로 진행
+    """
+    last_full_sync = float(store.get_state('haccp.last_full_sync', 0))
+
+    if incremental and time.time() - last_full_sync >= FULL_SYNC_DAYS * 86400:
+        print(f"[Sync] Last full sync is older than {FULL_SYNC_DAYS:g} days, running full sync")
+        incremental = False
+
+    http_pool = HTTPClientPool(pool_maxsize=1)
+
+    first_page, total_count = fetch_page(http_pool, 1, num_of_rows)
+    last_page = max(1, -(-total_count // num_of_rows))
+
+    if incremental:
+        synced_count = int(store.get_state('haccp.total_count', 0))
+        start_page = max(1, synced_count // num_of_rows + 1 - OVERLAP_PAGES)
+        print(f"[Sync] Incremental: {synced_count} → {total_count} records")
+    else:
+        start_page = int(store.get_state('haccp.next_page', 1))
+        print(f"[Sync] Full sync: {total_count} records, {last_page} pages (starting at page {start_page})")
+
+    saved = 0
+    for page_no in range(start_page, last_page + 1):
+        products = first_page if page_no == 1 else fetch_page(http_pool, page_no, num_of_rows)[0]
+        saved += store.upsert_many(products)
+
+        if not incremental:
+            store.set_state('haccp.next_page', page_no + 1)
+
+        print(f"[Sync] Page {page_no}/{last_page}: {saved} records saved")
+        time.sleep(delay)
+
+    # 완료 후 다음 전체 동기화는 처음부터 시작
+    store.set_state('haccp.next_page', 1)
+    store.set_state('haccp.total_count', total_count)
+    store.set_state('haccp.last_sync', time.time())
+    if not incremental:
+        store.set_state('haccp.last_full_sync', time.time())
+
+    print(f"[Sync] ✓ Done: {saved} records saved, {store.count()} records in mirror")
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='HACCP 인증 제품 데이터셋 로컬 동기화')
+    parser.add_argument('--incremental', action='store_true', help='지난 동기화 이후 추가된 페이지만 가져오기 (전체 동기화 주기가 지났으면 전체)')
+    parser.add_argument('--rows', type=int, default=MAX_ROWS_PER_PAGE, help='페이지당 건수')
+    parser.add_argument('--delay', type=float, default=0.2, help='페이지 요청 간격 (초)')
+    parser.add_argument('--db', default=LOCAL_STORE_DB, help='로컬 저장소 SQLite 파일')
+    args = parser.parse_args()
+
+    if not SERVICE_KEY:
+        raise SystemExit('SERVICE_KEY not set')
+
+    sync(HACCPMirrorStore(args.db), incremental=args.incremental, num_of_rows=args.rows, delay=args.delay)
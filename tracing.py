@@ -0,0 +1,122 @@
+"""요청 단위 단계별 소요 시간 추적 (Server-Timing 헤더 / 디버그 응답용)"""
+import contextvars
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# 현재 요청의 Trace (스레드 풀 작업에도 contextvars로 전달되어 같은 Trace에 기록됨)
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+# Server-Timing 헤더에 넣을 최대 구간 수 (배치 요청에서 헤더가 너무 커지지 않도록)
+MAX_HEADER_SPANS = 50
+
+
+class Trace:
+    """한 요청에서 기록된 구간 목록"""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+
+    def add(self, name, started, duration, outcome, detail=None):
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'start': round((started - self.started) * 1000, 1),
+                'duration': round(duration * 1000, 1),
+                'outcome': outcome,
+                'detail': detail
+            })
+
+
+    def to_list(self):
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span['start'])
+
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (예: haccp;dur=120.5;desc="R1 hit")"""
+        entries = []
+
+        for span in self.to_list()[:MAX_HEADER_SPANS]:
+            desc = ' '.join(str(part) for part in (span['detail'], span['outcome']) if part)
+            # 헤더에는 ASCII만 허용되므로 나머지 문자는 제거
+            desc = ''.join(ch for ch in desc if ' ' <= ch <= '~' and ch not in '"\\')
+            entries.append(f'{span["name"]};dur={span["duration"]};desc="{desc}"')
+
+        entries.append(f'total;dur={round((time.perf_counter() - self.started) * 1000, 1)}')
+        return ', '.join(entries)
+
+
+def start_trace():
+    """새 Trace 시작, contextvars 복원용 토큰 반환"""
+    return current_trace.set(Trace())
+
+
+@contextmanager
+def span(name, detail=None):
+    """
+    구간 기록 (추적 중인 요청이 없으면 아무것도 하지 않음)
+
+    with span('foodqr_imrptNo', search_value) as result:
+        ...
+        result['outcome'] = 'hit'
+    """
+    trace = current_trace.get()
+    result = {'outcome': 'ok'}
+
+    if trace is None:
+        yield result
+        return
+
+    started = time.perf_counter()
+    try:
+        yield result
+    except Exception:
+        result['outcome'] = 'error'
+        raise
+    finally:
+        trace.add(name, started, time.perf_counter() - started, result['outcome'], detail)
+
+
+def traced(name, with_detail=True):
+    """
+    검색 함수용 데코레이터: 반환값이 None이면 miss, 아니면 hit로 기록
+
+    첫 번째 인자(검색값)를 detail로 남겨 같은 함수의 재검색(예: C005 매핑 후 HACCP)도 구분합니다.
+    원재료명처럼 검색값이 아닌 인자를 받는 함수는 with_detail=False로 사용합니다.
+    """
+    def detail_for(args):
+        return args[0] if with_detail and args and isinstance(args[0], str) and len(args[0]) <= 32 else None
+
+    def decorator(func):
+        # 비동기 모드(asgi.py)의 코루틴 검색 함수
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if current_trace.get() is None:
+                    return await func(*args, **kwargs)
+
+                with span(name, detail_for(args)) as result:
+                    value = await func(*args, **kwargs)
+                    result['outcome'] = 'miss' if value is None else 'hit'
+                    return value
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_trace.get() is None:
+                return func(*args, **kwargs)
+
+            with span(name, detail_for(args)) as result:
+                value = func(*args, **kwargs)
+                result['outcome'] = 'miss' if value is None else 'hit'
+                return value
+
+        return wrapper
+    return decorator